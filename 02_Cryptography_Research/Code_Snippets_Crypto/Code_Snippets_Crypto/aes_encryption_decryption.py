@@ -3,6 +3,9 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import padding
 import os
 
+BLOCK_BYTES = algorithms.AES.block_size // 8
+CHUNK_SIZE = 64 * 1024 # Bytes read per step by the streaming functions
+
 def aes_encrypt(plaintext, key):
     """Encrypts plaintext using AES in CBC mode with a random IV."""
     # Generate a random 16-byte IV
@@ -29,6 +32,127 @@ def aes_decrypt(ciphertext, key, iv):
     plaintext = unpadder.update(decrypted_padded_text) + unpadder.finalize()
     return plaintext
 
+# --- Streaming API ---
+# Streams use the layout IV || CBC ciphertext, so iv + ciphertext from aes_encrypt decrypts the same way.
+# Input and output buffers are allocated once and filled with readinto/update_into, so memory use depends
+# on chunk_size only, not on the size of the data.
+
+def _read_chunks(src, buf):
+    """Yields views of buf filled from a binary file, or chunk_size slices of an iterable of bytes chunks."""
+    if hasattr(src, "readinto"):
+        view = memoryview(buf)
+        while True:
+            n = src.readinto(buf)
+            if not n:
+                break
+            yield view[:n]
+    else:
+        for chunk in src:
+            chunk = memoryview(chunk)
+            for start in range(0, len(chunk), len(buf)):
+                yield chunk[start:start + len(buf)]
+
+def _encrypt_chunks(src, key, iv, chunk_size):
+    """Yields ciphertext as views of one reused output buffer; each view is only valid until the next one."""
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend()).encryptor()
+    in_buf = bytearray(chunk_size)
+    out_buf = bytearray(chunk_size + BLOCK_BYTES - 1) # update_into needs room for a carried-over partial block
+    out_view = memoryview(out_buf)
+    total = 0
+    for chunk in _read_chunks(src, in_buf):
+        n = encryptor.update_into(chunk, out_buf)
+        total += len(chunk)
+        if n:
+            yield out_view[:n]
+
+    # PKCS7 only depends on the total length, so the padding is fed in after the last chunk
+    pad_len = BLOCK_BYTES - total % BLOCK_BYTES
+    n = encryptor.update_into(bytes([pad_len]) * pad_len, out_buf)
+    yield out_view[:n]
+    encryptor.finalize()
+
+def _decrypt_chunks(src, key, chunk_size):
+    """Yields plaintext views of reused buffers from an IV-prefixed stream, removing the padding at the end."""
+    in_buf = bytearray(chunk_size)
+    out_buf = bytearray(chunk_size + BLOCK_BYTES - 1)
+    out_view = memoryview(out_buf)
+    iv = bytearray()
+    decryptor = None
+    tail = bytearray(BLOCK_BYTES) # Last plaintext block, held back because it carries the padding
+    have_tail = False
+    for chunk in _read_chunks(src, in_buf):
+        if decryptor is None:
+            # The IV may arrive split across the first chunks of an iterable
+            take = BLOCK_BYTES - len(iv)
+            iv += chunk[:take]
+            chunk = chunk[take:]
+            if len(iv) < BLOCK_BYTES:
+                continue
+            decryptor = Cipher(algorithms.AES(key), modes.CBC(bytes(iv)), backend=default_backend()).decryptor()
+        n = decryptor.update_into(chunk, out_buf)
+        if not n:
+            continue
+        if have_tail:
+            yield tail
+        yield out_view[:n - BLOCK_BYTES]
+        tail[:] = out_view[n - BLOCK_BYTES:n]
+        have_tail = True
+
+    if decryptor is None:
+        raise ValueError("Stream is shorter than the IV.")
+    decryptor.finalize() # Raises if the ciphertext is not a whole number of blocks
+    if not have_tail:
+        raise ValueError("Stream has no ciphertext.")
+    unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+    yield unpadder.update(bytes(tail)) + unpadder.finalize()
+
+def aes_encrypt_stream(src, dst, key, chunk_size=CHUNK_SIZE):
+    """Encrypts a binary file or iterable of bytes chunks into dst as IV || ciphertext; returns bytes written."""
+    iv = os.urandom(BLOCK_BYTES)
+    dst.write(iv)
+    written = len(iv)
+    for block in _encrypt_chunks(src, key, iv, chunk_size):
+        dst.write(block)
+        written += len(block)
+    return written
+
+def aes_decrypt_stream(src, dst, key, chunk_size=CHUNK_SIZE):
+    """Decrypts an IV || ciphertext stream from src into dst; returns plaintext bytes written."""
+    written = 0
+    for block in _decrypt_chunks(src, key, chunk_size):
+        dst.write(block)
+        written += len(block)
+    return written
+
+def aes_encrypt_iter(chunks, key, chunk_size=CHUNK_SIZE):
+    """Generator version of aes_encrypt_stream: yields the IV, then ciphertext chunks as bytes."""
+    iv = os.urandom(BLOCK_BYTES)
+    yield iv
+    for block in _encrypt_chunks(chunks, key, iv, chunk_size):
+        yield bytes(block)
+
+def aes_decrypt_iter(chunks, key, chunk_size=CHUNK_SIZE):
+    """Generator version of aes_decrypt_stream: yields plaintext chunks as bytes."""
+    for block in _decrypt_chunks(chunks, key, chunk_size):
+        yield bytes(block)
+
+def aes_encrypt_file(in_path, out_path, key, chunk_size=CHUNK_SIZE):
+    """Encrypts the file at in_path into out_path in constant memory."""
+    # Unbuffered input: readinto fills our buffer directly instead of going through a second one
+    with open(in_path, "rb", buffering=0) as src, open(out_path, "wb") as dst:
+        return aes_encrypt_stream(src, dst, key, chunk_size)
+
+def aes_decrypt_file(in_path, out_path, key, chunk_size=CHUNK_SIZE):
+    """Decrypts the file at in_path into out_path; out_path is removed if decryption fails."""
+    try:
+        with open(in_path, "rb", buffering=0) as src, open(out_path, "wb") as dst:
+            return aes_decrypt_stream(src, dst, key, chunk_size)
+    except Exception:
+        # Wrong key or corrupted file: don't leave partial plaintext behind
+        if os.path.exists(out_path):
+            os.remove(out_path)
+        raise
+
 if __name__ == "__main__":
     # Generate a random 256-bit (32-byte) AES key
     aes_key = os.urandom(32) # AES-256
@@ -63,4 +187,40 @@ if __name__ == "__main__":
         decrypted_wrong_iv = aes_decrypt(encrypted_message, aes_key, incorrect_iv)
         print(f"Decrypted with wrong IV: {decrypted_wrong_iv.decode('utf-8')}")
     except Exception as e:
-        print(f"Decryption with wrong IV failed as expected: {e}")
\ No newline at end of file
+        print(f"Decryption with wrong IV failed as expected: {e}")
+
+    # Streaming a large file in constant memory
+    print("\n--- Streaming file encryption ---")
+    import tempfile
+    import time
+    import tracemalloc
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_path = os.path.join(tmp, "corpus.txt")
+        with open(plain_path, "wb") as f:
+            for _ in range(64):
+                f.write(os.urandom(1024 * 1024)) # 64 MB of data
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        aes_encrypt_file(plain_path, plain_path + ".enc", aes_key)
+        aes_decrypt_file(plain_path + ".enc", plain_path + ".dec", aes_key)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        with open(plain_path, "rb") as a, open(plain_path + ".dec", "rb") as b:
+            print(f"Round trip of 64 MB matches: {a.read() == b.read()}")
+        print(f"Encrypt + decrypt took {elapsed:.2f}s, peak Python allocations {peak / 1024:.0f} KB")
+
+        try:
+            aes_decrypt_file(plain_path + ".enc", plain_path + ".bad", os.urandom(32))
+        except ValueError as e:
+            print(f"Streaming decryption with wrong key failed as expected: {e}")
+        print(f"Partial output removed: {not os.path.exists(plain_path + '.bad')}")
+
+    # Iterators, and compatibility with aes_encrypt output
+    chunks = [message_bytes[i:i + 7] for i in range(0, len(message_bytes), 7)]
+    streamed = b"".join(aes_encrypt_iter(chunks, aes_key))
+    print(f"Iterator round trip: {b''.join(aes_decrypt_iter([streamed], aes_key)) == message_bytes}")
+    print(f"aes_encrypt output decrypts as a stream: {b''.join(aes_decrypt_iter([iv + encrypted_message], aes_key)) == message_bytes}")
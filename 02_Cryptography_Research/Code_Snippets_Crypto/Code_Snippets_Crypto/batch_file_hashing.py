@@ -0,0 +1,186 @@
+from concurrent.futures import ThreadPoolExecutor
+from hashing_sha256 import hash_file
+import hashlib
+import os
+import sqlite3
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "file_hash_cache.sqlite3")
+DEFAULT_WORKERS = 8 # Hashing is mostly I/O, and hashlib releases the GIL, so threads overlap well
+_SQLITE_BATCH = 500 # Stay well under SQLite's bound-parameter limit
+_DIGEST_MODULUS = 2 ** 256
+
+# --- Directory digest ---
+# The directory digest is the sum, mod 2^256, of sha256(relative path | 0x00 | file digest) over all files.
+# A sum can be updated per file: subtract the old file's term and add the new one, so re-verifying a tree
+# costs one stat per file plus hashing only what changed. Being additive, it detects accidental changes
+# and corruption; against someone deliberately crafting collisions, use a sorted Merkle tree instead.
+
+def _file_key(stat):
+    """The cache is trusted only while the file's size, mtime and inode are all unchanged."""
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+def _entry_term(relpath, digest):
+    entry = relpath.replace(os.sep, "/").encode("utf-8") + b"\x00" + bytes.fromhex(digest)
+    return int.from_bytes(hashlib.sha256(entry).digest(), "big")
+
+class HashCache:
+    """SQLite store of file digests keyed by (path, size, mtime, inode), plus the last digest of each directory."""
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH):
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.db_path = os.path.abspath(db_path)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL, "
+            "digest TEXT NOT NULL)"
+        )
+        # Which files (and digests) the stored directory sum was last built from
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS directory_entries ("
+            "root TEXT NOT NULL, path TEXT NOT NULL, digest TEXT NOT NULL, PRIMARY KEY (root, path))"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS directories (root TEXT PRIMARY KEY, digest TEXT NOT NULL)")
+        self.conn.commit()
+
+    def lookup(self, stats):
+        """Returns {path: digest} for the paths in a {path: os.stat_result} dict whose cache entry is still valid."""
+        found = {}
+        paths = list(stats)
+        for i in range(0, len(paths), _SQLITE_BATCH):
+            chunk = paths[i:i + _SQLITE_BATCH]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT path, size, mtime_ns, inode, digest FROM files WHERE path IN ({placeholders})", chunk
+            )
+            for path, size, mtime_ns, inode, digest in rows:
+                if (size, mtime_ns, inode) == _file_key(stats[path]):
+                    found[path] = digest
+        return found
+
+    def store(self, entries):
+        """Saves (path, os.stat_result, digest) triples."""
+        rows = [(path, *_file_key(stat), digest) for path, stat, digest in entries]
+        self.conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", rows)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+def hash_files(paths, cache=None, workers=DEFAULT_WORKERS):
+    """Returns {absolute path: sha256 hex digest}, hashing only files the cache can't vouch for, in parallel."""
+    stats = {}
+    for path in paths:
+        path = os.path.abspath(path)
+        stats[path] = os.stat(path)
+    digests = cache.lookup(stats) if cache is not None else {}
+    misses = [path for path in stats if path not in digests]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        fresh = dict(zip(misses, pool.map(hash_file, misses)))
+    # A file modified while it was being hashed must not be cached under its new size/mtime
+    settled = [(path, stats[path], digest) for path, digest in fresh.items()
+               if _file_key(os.stat(path)) == _file_key(stats[path])]
+    if cache is not None:
+        cache.store(settled)
+    digests.update(fresh)
+    return digests
+
+def _walk_files(root, exclude=()):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            if path not in exclude and os.path.isfile(path):
+                yield path
+
+def directory_digest(root, cache, workers=DEFAULT_WORKERS):
+    """Hashes every file under root through the cache and updates the directory digest incrementally.
+
+    Returns (digest, changes) where changes lists the relative paths added, modified and removed since
+    the previous call for this root.
+    """
+    root = os.path.abspath(root)
+    # Keep the cache database (and its WAL files) out of the digest if it lives inside the tree
+    exclude = {cache.db_path, cache.db_path + "-wal", cache.db_path + "-shm", cache.db_path + "-journal"}
+    digests = hash_files(_walk_files(root, exclude), cache, workers)
+
+    previous = dict(cache.conn.execute("SELECT path, digest FROM directory_entries WHERE root = ?", (root,)))
+    stored = cache.conn.execute("SELECT digest FROM directories WHERE root = ?", (root,)).fetchone()
+    total = int(stored[0], 16) if stored else 0
+    if not stored:
+        previous = {}
+
+    changes = {"added": [], "modified": [], "removed": []}
+    for path, digest in digests.items():
+        old = previous.get(path)
+        if old == digest:
+            continue
+        relpath = os.path.relpath(path, root)
+        if old is None:
+            changes["added"].append(relpath)
+        else:
+            changes["modified"].append(relpath)
+            total -= _entry_term(relpath, old)
+        total += _entry_term(relpath, digest)
+    for path in previous.keys() - digests.keys():
+        relpath = os.path.relpath(path, root)
+        changes["removed"].append(relpath)
+        total -= _entry_term(relpath, previous[path])
+    total %= _DIGEST_MODULUS
+
+    with cache.conn:
+        cache.conn.executemany("DELETE FROM directory_entries WHERE root = ? AND path = ?",
+                               [(root, os.path.join(root, relpath)) for relpath in changes["removed"]])
+        cache.conn.executemany("INSERT OR REPLACE INTO directory_entries VALUES (?, ?, ?)",
+                               [(root, path, digest) for path, digest in digests.items()
+                                if previous.get(path) != digest])
+        cache.conn.execute("INSERT OR REPLACE INTO directories VALUES (?, ?)", (root, f"{total:064x}"))
+    return f"{total:064x}", changes
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HashCache(os.path.join(tmp, "hash_cache.sqlite3"))
+
+        # Pass a directory (e.g. ../../../05_DataSet) to verify it; otherwise build a small example tree
+        root = sys.argv[1] if len(sys.argv) > 1 else os.path.join(tmp, "dataset")
+        if len(sys.argv) == 1:
+            for i in range(200):
+                os.makedirs(os.path.join(root, f"part{i % 10}"), exist_ok=True)
+                with open(os.path.join(root, f"part{i % 10}", f"file{i}.bin"), "wb") as f:
+                    f.write(os.urandom(256 * 1024))
+
+        start = time.perf_counter()
+        digest, changes = directory_digest(root, cache)
+        print(f"First pass: {len(changes['added'])} files hashed in {time.perf_counter() - start:.2f}s")
+        print(f"Directory digest: {digest}")
+
+        start = time.perf_counter()
+        digest_again, changes = directory_digest(root, cache)
+        print(f"\nSecond pass (nothing changed) took {time.perf_counter() - start:.3f}s")
+        print(f"Digest unchanged: {digest_again == digest}; changes: {changes}")
+
+        if len(sys.argv) == 1:
+            # Modify one file, add one, remove one
+            with open(os.path.join(root, "part3", "file3.bin"), "r+b") as f:
+                f.write(b"corrupted")
+            with open(os.path.join(root, "part0", "new.bin"), "wb") as f:
+                f.write(b"new file")
+            os.remove(os.path.join(root, "part5", "file5.bin"))
+
+            digest_changed, changes = directory_digest(root, cache)
+            print(f"\nAfter edits: {changes}")
+            print(f"Digest changed: {digest_changed != digest}")
+
+            # The incremental digest must equal one built from scratch with an empty cache
+            fresh_cache = HashCache(os.path.join(tmp, "fresh_cache.sqlite3"))
+            print(f"Matches a from-scratch digest: {directory_digest(root, fresh_cache)[0] == digest_changed}")
+            fresh_cache.close()
+        cache.close()
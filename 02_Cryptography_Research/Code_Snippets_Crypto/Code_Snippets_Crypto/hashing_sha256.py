@@ -1,4 +1,11 @@
 import hashlib
+import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+BUFFER_SIZE = 1024 * 1024 # Bytes per readinto when streaming a file
+CHUNK_SIZE = 4 * 1024 * 1024 # Bytes per Merkle leaf
 
 def generate_sha256_hash(data):
     """Generates the SHA-256 hash of the given data."""
@@ -10,6 +17,114 @@ def generate_sha256_hash(data):
     sha256_hash = hashlib.sha256(data).hexdigest()
     return sha256_hash
 
+def hash_file(path, algorithm="sha256", use_mmap=False, buffer_size=BUFFER_SIZE):
+    """Hashes a file of any size without loading it into memory; returns the hex digest."""
+    digest = hashlib.new(algorithm)
+    with open(path, "rb", buffering=0) as f:
+        if use_mmap and os.fstat(f.fileno()).st_size > 0: # Empty files can't be mapped
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest.update(mm) # The OS pages the file in; no copy through Python buffers
+        else:
+            # One reusable buffer; the view slice avoids copying a short final read
+            buf = bytearray(buffer_size)
+            view = memoryview(buf)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                digest.update(view[:n])
+    return digest.hexdigest()
+
+# --- Merkle tree over fixed-size chunks ---
+# Leaves are sha256(0x00 | chunk) and inner nodes sha256(0x01 | left | right), so a leaf can never be
+# passed off as an inner node; an odd node at the end of a level is carried up unchanged. Chunks are
+# independent, so they are hashed on a thread pool (hashlib releases the GIL while hashing large buffers).
+# The manifest stores every leaf, so a changed file shows which chunks differ and only those need rehashing.
+
+def _leaf_digest(data):
+    digest = hashlib.sha256(b"\x00")
+    digest.update(data)
+    return digest.hexdigest()
+
+def merkle_root(leaves):
+    """Combines hex leaf digests pairwise up to the root digest."""
+    if not leaves:
+        return _leaf_digest(b"")
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    while len(level) > 1:
+        paired = [hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest() for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0].hex()
+
+def _hash_chunks(path, indices, chunk_size, workers):
+    """Returns {index: leaf digest} for the given chunk indices of a file, hashed in parallel."""
+    if not indices:
+        return {}
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+                digests = pool.map(lambda i: _leaf_digest(view[i * chunk_size:(i + 1) * chunk_size]), indices)
+                return dict(zip(indices, digests))
+        finally:
+            view.release() # The map can't close while a view is exported
+
+def merkle_manifest(path, chunk_size=CHUNK_SIZE, workers=None):
+    """Hashes a file chunk by chunk in parallel; returns a manifest with every leaf and the root."""
+    stat = os.stat(path)
+    n_chunks = -(-stat.st_size // chunk_size)
+    digests = _hash_chunks(path, list(range(n_chunks)), chunk_size, workers)
+    leaves = [digests[i] for i in range(n_chunks)]
+    return {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "chunk_size": chunk_size,
+            "leaves": leaves, "root": merkle_root(leaves)}
+
+def verify_manifest(path, manifest, workers=None):
+    """Rehashes the file and returns the indices of chunks that no longer match (empty if intact)."""
+    current = merkle_manifest(path, manifest["chunk_size"], workers)
+    if current["root"] == manifest["root"]:
+        return []
+    old, new = manifest["leaves"], current["leaves"]
+    return [i for i in range(max(len(old), len(new))) if i >= len(old) or i >= len(new) or old[i] != new[i]]
+
+def update_manifest(manifest, changed_ranges=None, workers=None):
+    """Brings a manifest up to date with its file, rehashing as little as possible.
+
+    Unchanged size and mtime means nothing is rehashed. changed_ranges, a list of (offset, length) byte
+    ranges known to have been written, limits rehashing to the chunks they touch (plus any the file grew by);
+    without it every chunk is rehashed.
+    """
+    path, chunk_size = manifest["path"], manifest["chunk_size"]
+    stat = os.stat(path)
+    if stat.st_size == manifest["size"] and stat.st_mtime_ns == manifest["mtime_ns"]:
+        return manifest
+    if changed_ranges is None:
+        return merkle_manifest(path, chunk_size, workers)
+
+    n_chunks = -(-stat.st_size // chunk_size)
+    old_chunks = len(manifest["leaves"])
+    leaves = manifest["leaves"][:n_chunks]
+    stale = set(range(old_chunks, n_chunks))
+    if stat.st_size != manifest["size"]:
+        # The old and new last chunks may have changed length even if no byte in them was written
+        stale.update(i for i in (old_chunks - 1, n_chunks - 1) if 0 <= i < n_chunks)
+    for offset, length in changed_ranges:
+        stale.update(range(offset // chunk_size, min(n_chunks, -(-(offset + length) // chunk_size))))
+    leaves = leaves + [None] * (n_chunks - len(leaves))
+    for i, digest in _hash_chunks(path, sorted(stale), chunk_size, workers).items():
+        leaves[i] = digest
+    return {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "chunk_size": chunk_size,
+            "leaves": leaves, "root": merkle_root(leaves)}
+
+def save_manifest(manifest, manifest_path):
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+def load_manifest(manifest_path):
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
 if __name__ == "__main__":
     message1 = "The quick brown fox jumps over the lazy dog."
     message2 = "The quick brown fox jumps over the lazy cat."
@@ -32,29 +147,44 @@ if __name__ == "__main__":
     print(f"Hash 1 == Hash 2: {hash1 == hash2} (Different inputs produce different hashes)")
 
     # Example: Verifying file integrity
-    file_content = b"This is the content of my important file."
-    original_hash = generate_sha256_hash(file_content)
-    print(f"\nOriginal file content hash: {original_hash}")
+    import tempfile
+    import time
 
-    # Simulate accidental modification
-    modified_content = b"This is the content of my important file! (modified)"
-    modified_hash = generate_sha256_hash(modified_content)
-    print(f"Modified file content hash: {modified_hash}")
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "dataset.bin")
+        with open(file_path, "wb") as f:
+            for _ in range(128):
+                f.write(os.urandom(1024 * 1024)) # 128 MB
 
-    print(f"Hashes match (integrity check): {original_hash == modified_hash}")
+        original_hash = hash_file(file_path)
+        print(f"\nOriginal file hash: {original_hash}")
+        print(f"mmap hash matches: {hash_file(file_path, use_mmap=True) == original_hash}")
 
-    # Example: Password storage (simplified)
-    user_password = "MySuperSecretPassword123"
-    stored_hash = generate_sha256_hash(user_password)
-    print(f"\nSimulated stored password hash: {stored_hash}")
+        start = time.perf_counter()
+        manifest = merkle_manifest(file_path)
+        print(f"Merkle root over {len(manifest['leaves'])} chunks: {manifest['root']} "
+              f"({time.perf_counter() - start:.2f}s)")
 
-    # User attempts to log in
-    login_attempt_password = "MySuperSecretPassword123"
-    login_attempt_hash = generate_sha256_hash(login_attempt_password)
+        # Simulate accidental modification of a few bytes in the middle
+        with open(file_path, "r+b") as f:
+            f.seek(70 * 1024 * 1024)
+            f.write(b"modified")
+        print(f"Hashes match (integrity check): {hash_file(file_path) == original_hash}")
+        print(f"Changed chunks found by the manifest: {verify_manifest(file_path, manifest)}")
 
-    print(f"Login attempt hash matches stored hash: {login_attempt_hash == stored_hash}")
+        # The writer knows what it changed, so the manifest is refreshed by rehashing one chunk
+        start = time.perf_counter()
+        updated = update_manifest(manifest, changed_ranges=[(70 * 1024 * 1024, 8)])
+        elapsed = time.perf_counter() - start
+        print(f"Updated manifest in {elapsed:.3f}s; matches a full rehash: "
+              f"{updated['root'] == merkle_manifest(file_path)['root']}")
 
-    # Incorrect login attempt
-    wrong_password = "MyWrongPassword"
-    wrong_password_hash = generate_sha256_hash(wrong_password)
-    print(f"Incorrect login attempt hash matches stored hash: {wrong_password_hash == stored_hash}")
\ No newline at end of file
+    # Passwords: a fast unsalted hash like SHA-256 is the wrong tool (identical passwords give identical
+    # hashes, and attackers can test billions of guesses per second). Use password_hashing.py instead.
+    from password_hashing import hash_password, verify_password
+
+    user_password = "MySuperSecretPassword123"
+    stored_hash = hash_password(user_password)
+    print(f"\nStored password hash (salted scrypt): {stored_hash}")
+    print(f"Login attempt accepted: {verify_password('MySuperSecretPassword123', stored_hash)}")
+    print(f"Incorrect login attempt accepted: {verify_password('MyWrongPassword', stored_hash)}")
@@ -0,0 +1,215 @@
+from concurrent.futures import ProcessPoolExecutor
+import atexit
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+# --- Password hashing ---
+# Passwords are hashed with a random per-password salt and a deliberately slow key-derivation function
+# (scrypt, or PBKDF2-HMAC-SHA256 where scrypt is unavailable), then stored as one self-describing string:
+#   $scrypt$ln=15,r=8,p=1$<salt>$<hash>
+#   $pbkdf2-sha256$i=600000$<salt>$<hash>
+# (salt and hash in unpadded base64). Since the parameters are stored with the hash, the cost can be
+# raised later: needs_rehash tells when to re-hash a password at the next successful login.
+SALT_SIZE = 16
+HASH_SIZE = 32
+DEFAULT_SCRYPT = {"ln": 15, "r": 8, "p": 1} # N = 2^15: about 32 MB and tens of ms per hash
+DEFAULT_PBKDF2 = {"i": 600000} # OWASP's 2023 recommendation for PBKDF2-HMAC-SHA256
+METHODS = ("scrypt", "pbkdf2-sha256")
+MIN_SCRYPT_LN = 8 # Calibration floors: below these the hash is too cheap to be worth calling slow
+MIN_PBKDF2_ITERATIONS = 1000
+# Largest costs accepted from a stored hash, so a tampered entry can't demand gigabytes of memory or minutes of CPU
+MAX_SCRYPT_MEMORY = 1024 * 1024 * 1024
+MAX_SCRYPT_P = 16
+MAX_PBKDF2_ITERATIONS = 10000000
+# hashlib.scrypt only exists when Python is built against OpenSSL 1.1+; fall back to PBKDF2 otherwise
+DEFAULT_METHOD = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2-sha256"
+
+def _default_params(method):
+    return DEFAULT_SCRYPT if method == "scrypt" else DEFAULT_PBKDF2
+
+def _b64encode(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+def _derive(password, salt, method, params):
+    """Runs the key-derivation function for one password."""
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+    if method == "scrypt":
+        if not hasattr(hashlib, "scrypt"):
+            raise RuntimeError("This Python build has no hashlib.scrypt; scrypt hashes can't be checked here.")
+        n, r, p = 2 ** params["ln"], params["r"], params["p"]
+        # scrypt needs 128 * r * N bytes; hashlib refuses anything above 32 MB unless maxmem is raised
+        maxmem = 128 * r * (n + p + 2) + 1024 * 1024
+        return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=HASH_SIZE)
+    if method == "pbkdf2-sha256":
+        return hashlib.pbkdf2_hmac("sha256", password, salt, params["i"], dklen=HASH_SIZE)
+    raise ValueError(f"Unknown password hashing method '{method}'. Available: {', '.join(METHODS)}")
+
+def _valid_params(method, params):
+    if method == "scrypt":
+        return (params.keys() == {"ln", "r", "p"} and 1 <= params["ln"] <= 63 and params["r"] >= 1
+                and 1 <= params["p"] <= MAX_SCRYPT_P and 128 * params["r"] * 2 ** params["ln"] <= MAX_SCRYPT_MEMORY)
+    if method == "pbkdf2-sha256":
+        return params.keys() == {"i"} and 1 <= params["i"] <= MAX_PBKDF2_ITERATIONS
+    return False
+
+def _parse(encoded):
+    """Splits a stored hash into (method, params, salt, hash); raises ValueError if it is malformed."""
+    try:
+        _, method, param_text, salt, digest = encoded.split("$")
+        params = {key: int(value) for key, value in (item.split("=") for item in param_text.split(","))}
+        salt, digest = _b64decode(salt), _b64decode(digest)
+    except (ValueError, AttributeError):
+        raise ValueError("Malformed password hash.") from None
+    if not _valid_params(method, params) or len(digest) != HASH_SIZE:
+        raise ValueError("Malformed password hash.")
+    return method, params, salt, digest
+
+def hash_password(password, method=DEFAULT_METHOD, params=None):
+    """Hashes a password with a fresh random salt; returns the string to store."""
+    params = dict(params or _default_params(method))
+    salt = os.urandom(SALT_SIZE)
+    digest = _derive(password, salt, method, params)
+    param_text = ",".join(f"{key}={value}" for key, value in params.items())
+    return f"${method}${param_text}${_b64encode(salt)}${_b64encode(digest)}"
+
+def verify_password(password, encoded):
+    """Checks a password against a stored hash in constant time; a malformed stored hash never matches."""
+    try:
+        method, params, salt, expected = _parse(encoded)
+    except ValueError:
+        return False
+    return hmac.compare_digest(_derive(password, salt, method, params), expected)
+
+def needs_rehash(encoded, method=DEFAULT_METHOD, params=None):
+    """True if a stored hash was made with a different method or parameters than the current ones."""
+    params = params or _default_params(method)
+    try:
+        stored_method, stored_params, _, _ = _parse(encoded)
+    except ValueError:
+        return True
+    return stored_method != method or stored_params != dict(params)
+
+def _time_hash(method, params, rounds=3):
+    """Best-of-rounds time for one hash in seconds (the minimum filters out scheduler noise)."""
+    salt = os.urandom(SALT_SIZE)
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        _derive(b"calibration password", salt, method, params)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def calibrate(target_ms=250, method=DEFAULT_METHOD, max_memory_mb=256, r=8, p=1):
+    """Benchmarks this host and returns the strongest parameters whose hash stays within target_ms.
+
+    scrypt measures N = 2^10 first, halves N while that is too slow (or too large for max_memory_mb), then
+    doubles it while the next step still fits. PBKDF2 scales its iteration count from a measured run, since
+    its cost is linear in iterations. Neither goes below a floor (scrypt N = 2^MIN_SCRYPT_LN, PBKDF2
+    MIN_PBKDF2_ITERATIONS); on a host too slow for even that, the floor is returned and exceeds target_ms.
+    """
+    target = target_ms / 1000
+    memory_mb = lambda ln: 128 * r * 2 ** ln / (1024 * 1024)
+    if method == "scrypt":
+        params = {"ln": 10, "r": r, "p": p}
+        while params["ln"] > MIN_SCRYPT_LN and memory_mb(params["ln"]) > max_memory_mb:
+            params = dict(params, ln=params["ln"] - 1)
+        elapsed = _time_hash(method, params)
+        while params["ln"] > MIN_SCRYPT_LN and elapsed > target:
+            params = dict(params, ln=params["ln"] - 1)
+            elapsed = _time_hash(method, params)
+        # Doubling N roughly doubles the time, so stop once the next step would overshoot
+        while elapsed * 2 <= target:
+            candidate = dict(params, ln=params["ln"] + 1)
+            if memory_mb(candidate["ln"]) > max_memory_mb:
+                break
+            candidate_elapsed = _time_hash(method, candidate)
+            if candidate_elapsed > target:
+                break
+            params, elapsed = candidate, candidate_elapsed
+        return params
+    if method == "pbkdf2-sha256":
+        probe = 100000
+        elapsed = _time_hash(method, {"i": probe})
+        return {"i": max(MIN_PBKDF2_ITERATIONS, int(probe * target / elapsed) // 1000 * 1000)}
+    raise ValueError(f"Unknown password hashing method '{method}'. Available: {', '.join(METHODS)}")
+
+def _verify_pair(pair):
+    return verify_password(*pair)
+
+_verify_pool = None # (workers, ProcessPoolExecutor), started on first use and kept for later batches
+_verify_pool_lock = threading.Lock()
+
+def _get_verify_pool(workers):
+    global _verify_pool
+    workers = workers or os.cpu_count() or 1
+    with _verify_pool_lock:
+        if _verify_pool is None or _verify_pool[0] != workers:
+            if _verify_pool is not None:
+                _verify_pool[1].shutdown(wait=False)
+            _verify_pool = (workers, ProcessPoolExecutor(max_workers=workers))
+        return _verify_pool[1]
+
+@atexit.register
+def _shutdown_verify_pool():
+    global _verify_pool
+    with _verify_pool_lock:
+        if _verify_pool is not None:
+            _verify_pool[1].shutdown(wait=True)
+            _verify_pool = None
+
+def verify_many(credentials, workers=None, chunksize=4):
+    """Verifies (password, stored hash) pairs across CPU cores; returns a list of booleans in order.
+
+    Each verification is CPU-bound by design, so separate processes keep one slow batch from
+    stalling the others; workers defaults to the number of CPUs. The process pool is started once
+    and reused, so later batches don't pay for spawning workers.
+    """
+    credentials = list(credentials)
+    if not credentials:
+        return []
+    return list(_get_verify_pool(workers).map(_verify_pair, credentials, chunksize=chunksize))
+
+if __name__ == "__main__":
+    user_password = "MySuperSecretPassword123"
+    print(f"Default method on this host: {DEFAULT_METHOD}")
+
+    # Calibrate for a 100 ms login on this machine
+    start = time.perf_counter()
+    params = calibrate(target_ms=100)
+    pbkdf2_params = calibrate(target_ms=100, method="pbkdf2-sha256")
+    print(f"Calibrated in {time.perf_counter() - start:.1f}s: {DEFAULT_METHOD} {params}, pbkdf2 {pbkdf2_params}")
+
+    stored_hash = hash_password(user_password, params=params)
+    print(f"\nStored password hash: {stored_hash}")
+    print(f"Same password hashed again differs (random salt): {hash_password(user_password, params=params) != stored_hash}")
+
+    start = time.perf_counter()
+    print(f"\nCorrect login accepted: {verify_password(user_password, stored_hash)}")
+    print(f"Verification took {1000 * (time.perf_counter() - start):.0f} ms")
+    print(f"Incorrect login accepted: {verify_password('MyWrongPassword', stored_hash)}")
+
+    pbkdf2_hash = hash_password(user_password, method="pbkdf2-sha256", params=pbkdf2_params)
+    print(f"\nPBKDF2 hash: {pbkdf2_hash}")
+    print(f"PBKDF2 login accepted: {verify_password(user_password, pbkdf2_hash)}")
+    print(f"PBKDF2 hash needs a rehash with the calibrated {DEFAULT_METHOD} settings: {needs_rehash(pbkdf2_hash, params=params)}")
+
+    # A burst of logins verified in parallel
+    credentials = [(f"password{i}", hash_password(f"password{i}", params=params)) for i in range(16)]
+    credentials[3] = ("wrong guess", credentials[3][1])
+    credentials[5] = ("password5", "$scrypt$ln=40,r=8,p=1$tampered$entry") # Malformed: rejected, not raised
+    start = time.perf_counter()
+    results = verify_many(credentials)
+    print(f"\nVerified {len(results)} logins in {time.perf_counter() - start:.2f}s on {os.cpu_count()} CPU(s): "
+          f"{results.count(True)} accepted, rejected {[i for i, ok in enumerate(results) if not ok]}")
+
+    start = time.perf_counter()
+    verify_many(credentials)
+    print(f"Second batch on the warm pool took {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,157 @@
+# === Parallel Argos Translate ===
+# Shards a corpus across a process pool. Each worker loads the Argos/CTranslate2 translator once
+# in its initializer and then translates whole shards, so every core is busy instead of one.
+# Pools are kept per (language pair, threads per worker) for the life of the process, so repeated
+# calls (e.g. one per checkpointed chunk) reuse warm workers instead of reloading the model each time.
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from instrumentation import instrumented, record
+
+_worker_translator = None
+_pools = {} # (from_code, to_code, threads_per_worker) -> (workers, ProcessPoolExecutor)
+_pools_lock = threading.Lock()
+_ready_pairs = set() # Pairs known to be installed; failures are not remembered, so they are retried
+_install_lock = threading.Lock()
+
+
+def ensure_argos_package(from_code, to_code):
+    """Installs the Argos package for a language pair if needed; the package index is only fetched when it is missing."""
+    if (from_code, to_code) in _ready_pairs:
+        return True
+    with _install_lock: # One install at a time, so concurrent callers don't download the same package twice
+        if (from_code, to_code) in _ready_pairs:
+            return True
+        installed = _install_argos_package(from_code, to_code)
+        if installed:
+            _ready_pairs.add((from_code, to_code))
+        return installed
+
+
+def _install_argos_package(from_code, to_code):
+    from argostranslate import package
+
+    if any(p.from_code == from_code and p.to_code == to_code for p in package.get_installed_packages()):
+        return True
+    try:
+        print(f"Setting up Argos Translate ({from_code} -> {to_code})...")
+        package.update_package_index()
+        available_package = next((p for p in package.get_available_packages()
+                                  if p.from_code == from_code and p.to_code == to_code), None)
+        if available_package is None:
+            print(f"Warning: Argos Translate {from_code}-{to_code} package not found in available packages.")
+            return False
+        print(f"Installing Argos Translate {from_code}-{to_code} package...")
+        package.install_from_path(available_package.download())
+        return True
+    except Exception as e:
+        print(f"Error setting up Argos Translate: {e}")
+        return False
+
+
+def load_argos_translator(from_code, to_code):
+    """Returns the installed Argos translator for a language pair (raises StopIteration if missing)."""
+    from argostranslate import translate
+
+    installed_languages = translate.get_installed_languages()
+    from_lang = next(filter(lambda x: x.code == from_code, installed_languages))
+    to_lang = next(filter(lambda x: x.code == to_code, installed_languages))
+    return from_lang.get_translation(to_lang)
+
+
+def _init_worker(from_code, to_code, threads_per_worker):
+    """Loads the Argos translator once per worker process."""
+    global _worker_translator
+    # CTranslate2 sizes its thread pool from OMP_NUM_THREADS; one pool per core avoids oversubscription
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_worker)
+    _worker_translator = load_argos_translator(from_code, to_code)
+
+
+def _translate_shard(shard):
+    """Translates one shard in a worker, returning (translations, seconds spent) for the parent's metrics."""
+    start = time.perf_counter()
+    results = []
+    for s in shard:
+        try:
+            results.append(_worker_translator.translate(s))
+        except Exception as e:
+            print(f"❌ Argos Translate error for '{s[:50]}...': {e}")
+            results.append("[ERROR]")
+    return results, time.perf_counter() - start
+
+
+def _worker_ready(_):
+    # Sleeping briefly keeps this worker busy so the pool starts the others for the remaining calls
+    time.sleep(0.1)
+    return _worker_translator is not None
+
+
+def get_argos_pool(from_code, to_code, workers=None, threads_per_worker=1):
+    """Returns the shared worker pool for a language pair, creating it (or resizing it) if needed."""
+    workers = workers or os.cpu_count() or 1
+    key = (from_code, to_code, threads_per_worker)
+    with _pools_lock:
+        entry = _pools.get(key)
+        if entry is not None and entry[0] == workers:
+            return entry[1]
+        if entry is not None:
+            entry[1].shutdown(wait=False, cancel_futures=True)
+        # Spawned, not forked: pools are created from scheduler threads while torch/CTranslate2 threads and
+        # their OpenMP runtimes are live, which a forked child can deadlock on. A fresh interpreter also
+        # reads the OMP_NUM_THREADS set in _init_worker before CTranslate2 is imported.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(from_code, to_code, threads_per_worker))
+        _pools[key] = (workers, pool)
+        return pool
+
+
+def warm_argos_pool(from_code, to_code, workers=None, threads_per_worker=1):
+    """Starts every worker of the shared pool and waits until each has loaded its translator."""
+    workers = workers or os.cpu_count() or 1
+    pool = get_argos_pool(from_code, to_code, workers, threads_per_worker)
+    return all(pool.map(_worker_ready, range(workers)))
+
+
+def _discard_pool(from_code, to_code, threads_per_worker, pool):
+    with _pools_lock:
+        entry = _pools.get((from_code, to_code, threads_per_worker))
+        if entry is not None and entry[1] is pool:
+            del _pools[(from_code, to_code, threads_per_worker)]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def shutdown_argos_pools():
+    with _pools_lock:
+        pools = [pool for _, pool in _pools.values()]
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+@instrumented("argos.translate")
+def translate_argos_parallel(sentences, from_code, to_code, workers=None, shard_size=32, threads_per_worker=1):
+    """Translates sentences with Argos Translate across `workers` processes, preserving input order.
+
+    The worker pool is shared across calls with the same language pair and threads_per_worker.
+    """
+    shards = [sentences[i:i+shard_size] for i in range(0, len(sentences), shard_size)]
+    if not shards:
+        return []
+    results = []
+    pool = get_argos_pool(from_code, to_code, workers, threads_per_worker)
+    try:
+        for shard, (shard_results, seconds) in zip(shards, pool.map(_translate_shard, shards)):
+            record("argos.shard", seconds, sentences=len(shard), tokens_in=sum(len(s.split()) for s in shard))
+            results.extend(shard_results)
+    except BrokenProcessPool as e:
+        # A worker died (e.g. the language pair is not installed); keep the shards that finished and
+        # drop the pool so the next call starts fresh workers
+        print(f"❌ Argos Translate worker pool failed: {e}")
+        _discard_pool(from_code, to_code, threads_per_worker, pool)
+        results.extend(["[ERROR]"] * (len(sentences) - len(results)))
+    return results
@@ -0,0 +1,242 @@
+# === Engine Benchmark Suite ===
+# Throughput/latency sweep over corpus size, sentence-length bucket, batch size and thread count for each
+# engine. Google Translate and LibreTranslate are served by the local mock server, so their numbers measure
+# client overhead against a fixed simulated latency, not the real services. The translation cache is bypassed.
+# Every run is appended to a JSON-lines history, and each case's median is compared with the previous run on
+# the same machine, corpus selection and mock latency to catch regressions.
+#
+# Example (from 04_Code/Translation_Scripts/):
+#   python benchmark.py --engines google libretranslate m2m418m --format parallel \
+#       --paths ../../05_Data/Hindi_English/IITB.en-hi.en ../../05_Data/Hindi_English/IITB.en-hi.hi \
+#       --src en --tgt hi --limit 2000 --sizes 50 200 --buckets short long --batch-sizes 8 32 --threads 1 4
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from itertools import cycle, islice, product
+from argos_parallel import ensure_argos_package, translate_argos_parallel, warm_argos_pool
+from corpus import add_corpus_arguments, load_corpus_from_args
+from instrumentation import peak_rss_mb
+from m2m_translation import M2M_ENGINES, PRECISIONS, get_m2m_model, translate_m2m
+from mock_translation_server import start_mock_server
+from remote_backends import translate_google_concurrent, translate_libre_batched
+
+HISTORY_PATH = os.path.join('..', '..', '06_Results', 'benchmarks', 'benchmark_history.jsonl')
+ENGINES = ("google", "libretranslate", "argos") + tuple(M2M_ENGINES)
+# Source length in whitespace tokens (inclusive bounds; None means unbounded)
+LENGTH_BUCKETS = {"short": (1, 10), "medium": (11, 25), "long": (26, None), "all": (1, None)}
+# Sweep axes each engine actually uses; the rest are left out so they don't multiply identical cases
+ENGINE_AXES = {
+    "google": ("threads",),
+    "libretranslate": ("batch_size", "threads"),
+    "argos": ("batch_size", "threads"),
+    **{name: ("batch_size", "threads") for name in M2M_ENGINES},
+}
+
+
+def make_engine(engine, src_lang, tgt_lang, batch_size, threads, mock_url, precision="fp32"):
+    """Returns fn(sentences) -> translations for one engine configuration; models are loaded here, untimed.
+
+    Argos workers are started and load their translator here too, so timed rounds reuse the warm pool.
+    """
+    if engine == "google":
+        return lambda s: translate_google_concurrent(s, src_lang, tgt_lang, base_url=mock_url,
+                                                     concurrency=threads, rate=None)
+    if engine == "libretranslate":
+        return lambda s: translate_libre_batched(s, src_lang, tgt_lang, mock_url,
+                                                 max_batch_items=batch_size, concurrency=threads)
+    if engine == "argos":
+        ensure_argos_package(src_lang, tgt_lang)
+        warm_argos_pool(src_lang, tgt_lang, workers=threads)
+        return lambda s: translate_argos_parallel(s, src_lang, tgt_lang, workers=threads, shard_size=batch_size)
+    if engine in M2M_ENGINES:
+        import torch
+
+        tokenizer, model = get_m2m_model(M2M_ENGINES[engine], precision)
+
+        def translate(s):
+            torch.set_num_threads(threads)
+            return translate_m2m(s, tokenizer, model, src_lang, tgt_lang, batch_size=batch_size)
+        return translate
+    raise ValueError(f"Unknown engine '{engine}'. Available: {', '.join(ENGINES)}")
+
+
+def bucket_sentences(sentences, bucket):
+    low, high = LENGTH_BUCKETS[bucket]
+    return [s for s in sentences if low <= len(s.split()) and (high is None or len(s.split()) <= high)]
+
+
+def case_name(engine, params):
+    settings = ",".join(f"{key}={value}" for key, value in params.items() if value is not None)
+    return f"{engine}[{settings}]"
+
+
+def time_case(translate, sentences, rounds, warmup):
+    """Runs warm-up rounds untimed, then returns per-round wall times in seconds."""
+    for _ in range(warmup):
+        translate(sentences)
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        translate(sentences)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize(times, n_sentences):
+    median = statistics.median(times)
+    return {
+        "min_ms": 1000 * min(times),
+        "max_ms": 1000 * max(times),
+        "mean_ms": 1000 * statistics.fmean(times),
+        "stddev_ms": 1000 * statistics.stdev(times) if len(times) > 1 else 0.0,
+        "median_ms": 1000 * median,
+        "rounds": len(times),
+        "sentences": n_sentences,
+        "sentences_per_sec": n_sentences / median if median else None,
+        "ms_per_sentence": 1000 * median / n_sentences if n_sentences else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def print_table(results):
+    """pytest-benchmark style summary table, times in milliseconds."""
+    headers = ("Name (time in ms)", "Min", "Max", "Mean", "StdDev", "Median", "Rounds", "Sent/s")
+    rows = [(r["name"], f"{r['stats']['min_ms']:.2f}", f"{r['stats']['max_ms']:.2f}", f"{r['stats']['mean_ms']:.2f}",
+             f"{r['stats']['stddev_ms']:.2f}", f"{r['stats']['median_ms']:.2f}", str(r["stats"]["rounds"]),
+             f"{r['stats']['sentences_per_sec']:.1f}") for r in sorted(results, key=lambda r: r["name"])]
+    widths = [max(len(row[i]) for row in rows + [headers]) for i in range(len(headers))]
+    line = lambda row: "  ".join(cell.ljust(widths[0]) if i == 0 else cell.rjust(widths[i]) for i, cell in enumerate(row))
+    title = f" benchmark: {len(results)} cases "
+    print("\n" + title.center(sum(widths) + 2 * (len(widths) - 1), "-"))
+    print(line(headers))
+    print("-" * (sum(widths) + 2 * (len(widths) - 1)))
+    for row in rows:
+        print(line(row))
+
+
+def machine_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "commit": commit,
+    }
+
+
+def run_setup(args):
+    """Everything besides the case parameters that changes the timings; runs are only compared when it matches."""
+    return {
+        "corpus": {"format": args.format, "paths": [os.path.abspath(path) for path in args.paths],
+                   "src": args.src, "tgt": args.tgt, "src_field": args.src_field, "ref_field": args.ref_field,
+                   "offset": args.offset, "limit": args.limit, "sample": args.sample},
+        "mock_latency": args.mock_latency,
+    }
+
+
+def load_previous_run(history_path, machine, setup):
+    """Latest stored run from the same machine (commit aside) with the same setup, or None."""
+    if not os.path.exists(history_path):
+        return None
+    same_machine = lambda other: {k: v for k, v in other.items() if k != "commit"} == \
+                                 {k: v for k, v in machine.items() if k != "commit"}
+    previous = None
+    with open(history_path, encoding="utf-8") as f:
+        for line in f:
+            run = json.loads(line)
+            if same_machine(run["machine"]) and all(run.get(key) == value for key, value in setup.items()):
+                previous = run
+    return previous
+
+
+def find_regressions(results, previous, threshold):
+    """Cases whose median time grew by more than threshold (a fraction) since the previous run."""
+    if previous is None:
+        return []
+    before = {r["name"]: r["stats"]["median_ms"] for r in previous["results"]}
+    regressions = []
+    for r in results:
+        old = before.get(r["name"])
+        if old and r["stats"]["median_ms"] > old * (1 + threshold):
+            regressions.append((r["name"], old, r["stats"]["median_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput/latency benchmark sweep for the translation engines.")
+    parser.add_argument("--engines", nargs="+", default=["google", "libretranslate"], choices=ENGINES)
+    add_corpus_arguments(parser)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[50], help="Sentences per timed call")
+    parser.add_argument("--buckets", nargs="+", default=["all"], choices=list(LENGTH_BUCKETS))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[16])
+    parser.add_argument("--threads", nargs="+", type=int, default=[4],
+                        help="Request concurrency (remote), worker processes (Argos) or torch threads (M2M100)")
+    parser.add_argument("--precision", default="fp32", choices=PRECISIONS)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--mock-latency", type=float, default=0.05, help="Simulated remote latency in seconds")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--no-save", action="store_true", help="Do not append this run to the history")
+    parser.add_argument("--regression-threshold", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    sources, _ = load_corpus_from_args(args)
+    print(f"Loaded {len(sources)} source sentences.")
+    mock_server, mock_url = start_mock_server(latency=args.mock_latency)
+
+    results = []
+    for engine in args.engines:
+        axes = ENGINE_AXES[engine]
+        for size, bucket, batch_size, threads in product(args.sizes, args.buckets, args.batch_sizes, args.threads):
+            if "batch_size" not in axes and batch_size != args.batch_sizes[0]:
+                continue
+            params = {"n": size, "len": bucket,
+                      "batch": batch_size if "batch_size" in axes else None,
+                      "threads": threads,
+                      "precision": args.precision if engine in M2M_ENGINES else None}
+            pool = bucket_sentences(sources, bucket)
+            if not pool:
+                print(f"Skipping {case_name(engine, params)}: no sentences in the '{bucket}' bucket")
+                continue
+            # Smaller buckets are cycled up to the requested size; nothing is cached, so repeats cost the same
+            sentences = list(islice(cycle(pool), size))
+            name = case_name(engine, params)
+            translate = make_engine(engine, args.src, args.tgt, batch_size, threads, mock_url, args.precision)
+            stats = summarize(time_case(translate, sentences, args.rounds, args.warmup), len(sentences))
+            print(f"{name}: median {stats['median_ms']:.1f} ms, {stats['sentences_per_sec']:.1f} sentences/s")
+            results.append({"name": name, "engine": engine, "params": params, "stats": stats})
+    mock_server.shutdown()
+    if not results:
+        return
+
+    print_table(results)
+    machine = machine_info()
+    setup = run_setup(args)
+    regressions = find_regressions(results, load_previous_run(args.history, machine, setup), args.regression_threshold)
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} regression(s) beyond {args.regression_threshold:.0%} vs the previous run:")
+        for name, old, new in regressions:
+            print(f"  {name}: {old:.2f} ms -> {new:.2f} ms ({new / old - 1:+.1%})")
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(args.history) or ".", exist_ok=True)
+        run = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "machine": machine, **setup, "results": results}
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+        print(f"\n✅ Benchmark run appended to {args.history}")
+    if regressions and args.fail_on_regression:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
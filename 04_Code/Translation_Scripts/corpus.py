@@ -0,0 +1,139 @@
+# === Corpus Readers ===
+# Streaming readers for the benchmark datasets, so large dumps never have to be held in memory.
+# Every reader yields (source, reference) pairs lazily; load_corpus adds offset/limit/sample on top.
+import gzip
+import json
+import random
+import xml.etree.ElementTree as ET
+from itertools import islice
+
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+READERS = {}
+
+
+def register_reader(name):
+    """Registers a pair reader under a format name usable with load_corpus."""
+    def decorator(func):
+        READERS[name] = func
+        return func
+    return decorator
+
+
+def open_maybe_gzip(path, mode="rt"):
+    """Opens a file, transparently decompressing it if the name ends in .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding=None if "b" in mode else "utf-8")
+    return open(path, mode, encoding=None if "b" in mode else "utf-8")
+
+
+@register_reader("parallel")
+def iter_parallel_text(src_file_path, ref_file_path):
+    """Yields aligned (source, reference) lines from two parallel text files, skipping empty pairs."""
+    with open_maybe_gzip(src_file_path) as src_f, open_maybe_gzip(ref_file_path) as ref_f:
+        for src_line, ref_line in zip(src_f, ref_f):
+            src_line, ref_line = src_line.strip(), ref_line.strip()
+            if src_line and ref_line:
+                yield src_line, ref_line
+
+
+@register_reader("jsonl")
+def iter_jsonl_pairs(jsonl_file_path, src_field, ref_field):
+    """Yields (source, reference) fields from a JSON-lines file."""
+    with open_maybe_gzip(jsonl_file_path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            yield data[src_field], data[ref_field]
+
+
+@register_reader("tmx")
+def iter_tmx_pairs(tmx_file_path, src_lang, tgt_lang, limit=None):
+    """Yields (source, target) segment pairs from a TMX (or .tmx.gz) file using iterparse."""
+    count = 0
+    with open_maybe_gzip(tmx_file_path, "rb") as f:
+        body = None
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if elem.tag == "body":
+                    body = elem
+                continue
+            if elem.tag != "tu":
+                continue
+
+            langs = {}
+            for tuv in elem.iter("tuv"):
+                # OPUS dumps use xml:lang, older TMX versions use a plain lang attribute
+                lang = tuv.attrib.get(XML_LANG) or tuv.attrib.get("lang")
+                seg = tuv.find("seg")
+                if lang and seg is not None and seg.text:
+                    langs[lang] = seg.text.strip()
+
+            # Drop the finished <tu> so the tree never grows past a single unit
+            elem.clear()
+            if body is not None:
+                body.clear()
+
+            if src_lang in langs and tgt_lang in langs:
+                yield langs[src_lang], langs[tgt_lang]
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+
+def _reservoir_sample(pairs, k, seed):
+    """Uniformly samples k pairs from a stream in O(k) memory, keeping corpus order."""
+    rng = random.Random(seed)
+    reservoir = []
+    for i, pair in enumerate(pairs):
+        if i < k:
+            reservoir.append((i, pair))
+        else:
+            j = rng.randint(0, i)
+            if j < k:
+                reservoir[j] = (i, pair)
+    reservoir.sort(key=lambda item: item[0])
+    return [pair for _, pair in reservoir]
+
+
+def load_corpus(fmt, *paths, offset=0, limit=None, sample=None, seed=0, **reader_options):
+    """Lazily yields (source, reference) pairs from any registered reader.
+
+    offset skips the first pairs, limit caps how many are read after the offset and
+    sample draws that many pairs uniformly at random (in corpus order) from what remains.
+    """
+    if fmt not in READERS:
+        raise ValueError(f"Unknown corpus format '{fmt}'. Available: {', '.join(sorted(READERS))}")
+    pairs = READERS[fmt](*paths, **reader_options)
+    end = offset + limit if limit is not None else None
+    pairs = islice(pairs, offset, end)
+    if sample is not None:
+        yield from _reservoir_sample(pairs, sample, seed)
+    else:
+        yield from pairs
+
+
+def add_corpus_arguments(parser):
+    """Adds the corpus selection options shared by the command-line report and benchmark tools."""
+    parser.add_argument("--format", required=True, choices=sorted(READERS), help="Corpus reader")
+    parser.add_argument("--paths", nargs="+", required=True, help="Corpus file(s); parallel takes source then reference")
+    parser.add_argument("--src", required=True, help="Source language code")
+    parser.add_argument("--tgt", required=True, help="Target language code")
+    parser.add_argument("--src-field", default="english", help="JSONL source field")
+    parser.add_argument("--ref-field", default="chinese", help="JSONL reference field")
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--sample", type=int, default=None)
+
+
+def load_corpus_from_args(args):
+    """Returns (sources, references) lists for the corpus selected with add_corpus_arguments."""
+    reader_options = {}
+    if args.format == "tmx":
+        reader_options = {"src_lang": args.src, "tgt_lang": args.tgt}
+    elif args.format == "jsonl":
+        reader_options = {"src_field": args.src_field, "ref_field": args.ref_field}
+    pairs = list(load_corpus(args.format, *args.paths, offset=args.offset, limit=args.limit,
+                             sample=args.sample, **reader_options))
+    return [src for src, _ in pairs], [ref for _, ref in pairs]
@@ -0,0 +1,76 @@
+# === Engine Scheduler ===
+# Runs every translation engine at the same time instead of one after another. Remote engines only
+# wait on the network, so they start immediately; local models must first reserve their share of a
+# memory budget, which keeps the two M2M100 models from being resident (and competing for RAM) at once.
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from model_registry import default_memory_budget_gb
+
+# kind is "remote" (network-bound) or "local" (needs memory_gb of RAM/VRAM while it runs).
+# release, if given, frees a local job's memory (e.g. evicts its model) once it is done; it is only
+# called while other local jobs of the same run are unfinished, so the last model stays warm.
+EngineJob = namedtuple("EngineJob", ["name", "translate_fn", "kind", "memory_gb", "release"],
+                       defaults=("remote", 0.0, None))
+
+
+class MemoryBudget:
+    """Blocking reservation of a fixed memory budget shared by the local engine jobs."""
+
+    def __init__(self, total_gb):
+        self.total_gb = total_gb
+        self.used_gb = 0.0
+        self.condition = threading.Condition()
+
+    def acquire(self, amount_gb):
+        with self.condition:
+            # A job larger than the whole budget may still run, but only on its own
+            self.condition.wait_for(lambda: self.used_gb == 0 or self.used_gb + amount_gb <= self.total_gb)
+            self.used_gb += amount_gb
+
+    def release(self, amount_gb):
+        with self.condition:
+            self.used_gb -= amount_gb
+            self.condition.notify_all()
+
+
+def run_engines(jobs, sentences, memory_budget_gb=None):
+    """Runs all engine jobs concurrently and returns ({name: translations}, {name: seconds})."""
+    if memory_budget_gb is None:
+        memory_budget_gb = default_memory_budget_gb()
+    budget = MemoryBudget(memory_budget_gb)
+    translations = {}
+    timings = {}
+    unfinished_local = [sum(job.kind == "local" for job in jobs)]
+    unfinished_lock = threading.Lock()
+
+    def run(job):
+        if job.kind == "local":
+            budget.acquire(job.memory_gb)
+        start = time.perf_counter()
+        try:
+            print(f"🔄 Translating with {job.name}...")
+            translations[job.name] = job.translate_fn(sentences)
+        except Exception as e:
+            print(f"❌ {job.name} failed: {e}")
+            translations[job.name] = ["[ERROR]" for _ in sentences]
+        finally:
+            timings[job.name] = time.perf_counter() - start
+            if job.kind == "local":
+                with unfinished_lock:
+                    unfinished_local[0] -= 1
+                    others_waiting = unfinished_local[0] > 0
+                # The reservation only covers the job while it runs; a model left resident afterwards
+                # would otherwise sit next to the one the next local job loads
+                if job.release and others_waiting:
+                    job.release()
+                budget.release(job.memory_gb)
+        print(f"✅ {job.name} finished in {timings[job.name]:.1f}s")
+
+    # Biggest local jobs first, so smaller ones can fill the remaining budget around them
+    ordered = sorted(jobs, key=lambda job: job.memory_gb, reverse=True)
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+        for future in [pool.submit(run, job) for job in ordered]:
+            future.result()
+    return {job.name: translations[job.name] for job in jobs}, timings
@@ -0,0 +1,218 @@
+# === Latency Instrumentation ===
+# Lightweight timing spans around backend calls and model batches. Each span name keeps running totals
+# (calls, sentences, tokens in/out, padded token slots) and a fixed log-bucketed latency histogram, so
+# recording costs a few counter updates and memory stays constant however long the process runs.
+# report() gives p50/p95/p99, sentences/sec, padding ratio and peak RSS per span; write_report saves it as JSON.
+# sentences/sec divides by summed span time, so for spans that overlap (concurrent requests) it is per request slot.
+# Set TRANSLATION_METRICS=0 to turn recording off.
+#
+# Usage:
+#   with span("m2m.generate", sentences=len(batch), tokens_in=n_tokens) as s:
+#       outputs = model.generate(...)
+#       s.tokens_out = n_generated
+#
+#   @instrumented("google.translate")
+#   def translate_google(sentences, ...): ...
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+ENABLED = os.environ.get("TRANSLATION_METRICS", "1") != "0"
+
+# Histogram buckets grow by 5% from 10 µs, so percentiles are accurate to within about 2.5%
+_BUCKET_GROWTH = 1.05
+_BUCKET_MIN_MS = 0.01
+_BUCKET_COUNT = 500 # Up to roughly 11 hours
+
+
+def peak_rss_mb(children=False):
+    """Peak resident set size of this process (or its finished children) in MB, if the platform reports it."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with constant memory."""
+
+    def __init__(self):
+        self.counts = [0] * _BUCKET_COUNT
+        self.total = 0
+
+    def add(self, ms):
+        if ms <= _BUCKET_MIN_MS:
+            bucket = 0
+        else:
+            bucket = min(_BUCKET_COUNT - 1, int(math.log(ms / _BUCKET_MIN_MS, _BUCKET_GROWTH)) + 1)
+        self.counts[bucket] += 1
+        self.total += 1
+
+    def percentile(self, p):
+        if not self.total:
+            return None
+        rank = p / 100 * self.total
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                # Geometric midpoint of the bucket
+                return _BUCKET_MIN_MS * _BUCKET_GROWTH ** max(bucket - 0.5, 0)
+        return _BUCKET_MIN_MS * _BUCKET_GROWTH ** (_BUCKET_COUNT - 1)
+
+
+class SpanStats:
+    """Running totals for one span name."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.sentences = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.padded_tokens = 0
+        self.histogram = LatencyHistogram()
+        self.peak_rss_mb = None
+
+    def summary(self):
+        percentile = lambda p: round(self.histogram.percentile(p), 3) if self.calls else None
+        summary = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_sec": round(self.seconds, 4),
+            "sentences": self.sentences,
+            "sentences_per_sec": round(self.sentences / self.seconds, 2) if self.seconds else None,
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "mean_ms": round(1000 * self.seconds / self.calls, 3) if self.calls else None,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "tokens_out_per_sec": round(self.tokens_out / self.seconds, 2) if self.seconds and self.tokens_out else None,
+            "padding_ratio": round(1 - self.tokens_in / self.padded_tokens, 4) if self.padded_tokens else None,
+            "peak_rss_mb": round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+        }
+        return summary
+
+
+class Span:
+    """One timed call; sentences and token counts may be filled in while it runs."""
+
+    __slots__ = ("registry", "name", "sentences", "tokens_in", "tokens_out", "padded_tokens", "start")
+
+    def __init__(self, registry, name, sentences=0, tokens_in=0, tokens_out=0, padded_tokens=0):
+        self.registry = registry
+        self.name = name
+        self.sentences = sentences
+        self.tokens_in = tokens_in
+        self.tokens_out = tokens_out
+        self.padded_tokens = padded_tokens
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.record(self.name, time.perf_counter() - self.start, self.sentences, self.tokens_in,
+                             self.tokens_out, self.padded_tokens, error=exc_type is not None)
+        return False
+
+
+class _NullSpan:
+    """Stand-in used when instrumentation is disabled; attribute writes are ignored."""
+
+    sentences = tokens_in = tokens_out = padded_tokens = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class MetricsRegistry:
+    """Thread-safe collection of SpanStats keyed by span name."""
+
+    def __init__(self, enabled=ENABLED):
+        self.enabled = enabled
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def span(self, name, sentences=0, tokens_in=0, tokens_out=0, padded_tokens=0):
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, sentences, tokens_in, tokens_out, padded_tokens)
+
+    def record(self, name, seconds, sentences=0, tokens_in=0, tokens_out=0, padded_tokens=0, error=False):
+        """Adds one externally timed call (e.g. measured in a worker process)."""
+        if not self.enabled:
+            return
+        rss = peak_rss_mb()
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = SpanStats()
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.seconds += seconds
+            stats.sentences += sentences
+            stats.tokens_in += tokens_in
+            stats.tokens_out += tokens_out
+            stats.padded_tokens += padded_tokens
+            stats.histogram.add(1000 * seconds)
+            if rss is not None:
+                stats.peak_rss_mb = max(stats.peak_rss_mb or 0.0, rss)
+
+    def report(self):
+        with self.lock:
+            spans = {name: stats.summary() for name, stats in sorted(self.stats.items())}
+        return {
+            "spans": spans,
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_rss_children_mb": peak_rss_mb(children=True),
+        }
+
+    def write_report(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+
+
+metrics = MetricsRegistry()
+span = metrics.span
+record = metrics.record
+
+
+def instrumented(name):
+    """Decorator timing every call as a span; the first argument is taken as the list of sentences."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            sentences = args[0] if args else kwargs.get("sentences", ())
+            with metrics.span(name, sentences=len(sentences) if hasattr(sentences, "__len__") else 0):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,143 @@
+# === M2M100 on CTranslate2 ===
+# Export-and-serve path that converts facebook/m2m100_* checkpoints to CTranslate2 (the same CPU runtime
+# Argos Translate uses) with int8 weights, and translates through a translate_m2m-style interface.
+# Running this file checks output parity against the PyTorch path on a corpus slice.
+#
+# Example (from 04_Code/Translation_Scripts/):
+#   python m2m_ctranslate2.py --model facebook/m2m100_418M --format parallel \
+#       --paths ../../05_Data/Hindi_English/IITB.en-hi.en ../../05_Data/Hindi_English/IITB.en-hi.hi \
+#       --src en --tgt hi --limit 100
+import argparse
+import os
+import time
+from functools import partial
+from m2m_translation import (DECODING_PROFILES, MODEL_MEMORY_GB, encode_source, load_m2m_model,
+                             make_length_batches, model_registry, translate_m2m)
+from instrumentation import instrumented, span
+
+CT2_MODEL_DIR = os.path.join('..', '..', '06_Results', 'ct2_models')
+CT2_COMPUTE_TYPES = ("int8", "int8_float32", "int8_float16", "int8_bfloat16", "float16", "bfloat16", "float32")
+# The converted model holds no optimizer/autograd state and int8 weights are a quarter of fp32
+CT2_MEMORY_FACTOR = {"int8": 0.35, "int8_float32": 0.35, "int8_float16": 0.35, "int8_bfloat16": 0.35,
+                     "float16": 0.5, "bfloat16": 0.5, "float32": 0.9}
+# Equivalent CTranslate2 compute type for each m2m_translation precision
+CT2_COMPUTE_TYPE_FOR_PRECISION = {"fp32": "float32", "int8": "int8", "bf16": "bfloat16"}
+# What the "default" profile means for M2M100: the checkpoint's own generation config
+CT2_DEFAULT_DECODING = {"num_beams": 5, "max_length": 200}
+
+
+def export_m2m_ct2(model_name, quantization="int8", force=False):
+    """Converts a Hugging Face M2M100 checkpoint to a CTranslate2 model directory (once) and returns its path."""
+    output_dir = os.path.join(CT2_MODEL_DIR, f"{model_name.replace('/', '__')}-{quantization}")
+    if os.path.isdir(output_dir) and not force:
+        return output_dir
+    import ctranslate2
+
+    print(f"Converting {model_name} to CTranslate2 ({quantization})...")
+    os.makedirs(CT2_MODEL_DIR, exist_ok=True)
+    converter = ctranslate2.converters.TransformersConverter(model_name)
+    converter.convert(output_dir, quantization=quantization, force=True)
+    return output_dir
+
+
+def load_m2m_ct2(model_name, compute_type="int8", device="cpu", inter_threads=1, intra_threads=0):
+    """Returns (tokenizer, ctranslate2.Translator) for model_name, exporting the model first if needed."""
+    import ctranslate2
+    from transformers import M2M100Tokenizer
+
+    if compute_type not in CT2_COMPUTE_TYPES:
+        raise ValueError(f"Unknown compute type '{compute_type}'. Available: {', '.join(CT2_COMPUTE_TYPES)}")
+    model_dir = export_m2m_ct2(model_name, quantization=compute_type)
+    print(f"Loading {model_name} (CTranslate2 {compute_type}) on {device}...")
+    translator = ctranslate2.Translator(model_dir, device=device, compute_type=compute_type,
+                                        inter_threads=inter_threads, intra_threads=intra_threads)
+    tokenizer = M2M100Tokenizer.from_pretrained(model_name)
+    return tokenizer, translator
+
+
+def ct2_model_key(model_name, compute_type="int8"):
+    return f"{model_name}@ct2-{compute_type}"
+
+
+def get_m2m_ct2(model_name, compute_type="int8"):
+    """Returns (tokenizer, translator) through the shared model registry, loading it on first use."""
+    key = ct2_model_key(model_name, compute_type)
+    with model_registry.lock:
+        if key not in model_registry.loaders:
+            model_registry.register(key, partial(load_m2m_ct2, model_name, compute_type),
+                                    MODEL_MEMORY_GB[model_name] * CT2_MEMORY_FACTOR[compute_type])
+    return model_registry.get(key)
+
+
+def _ct2_decoding_options(decoding, src_len):
+    """Maps a DECODING_PROFILES entry onto CTranslate2 translate_batch options."""
+    profile = DECODING_PROFILES[decoding] if isinstance(decoding, str) else decoding
+    if not profile:
+        profile = CT2_DEFAULT_DECODING
+    options = {"beam_size": profile.get("num_beams", 1)}
+    if "max_len_ratio" in profile:
+        # +1 for the forced target-language token, which CTranslate2 counts towards the length
+        options["max_decoding_length"] = int(profile["max_len_ratio"] * src_len) + profile.get("max_len_offset", 0) + 1
+    elif "max_length" in profile:
+        options["max_decoding_length"] = profile["max_length"]
+    return options
+
+
+@instrumented("ct2.translate")
+def translate_m2m_ct2(sentences, tokenizer, translator, src_lang, tgt_lang, max_tokens=1024, decoding="default"):
+    """CTranslate2 counterpart of translate_m2m: length-bucketed batches, results in input order."""
+    encode = lambda tok: [tok.convert_ids_to_tokens(tok.encode(s, truncation=True)) for s in sentences]
+    source_tokens = encode_source(tokenizer, src_lang, encode)
+    target_prefix = [tokenizer.get_lang_token(tgt_lang)]
+    results = [None] * len(sentences)
+    for indices in make_length_batches([len(tokens) for tokens in source_tokens], max_tokens):
+        batch = [source_tokens[i] for i in indices]
+        longest = max(len(tokens) for tokens in batch)
+        options = _ct2_decoding_options(decoding, longest)
+        with span("ct2.translate_batch", sentences=len(batch), tokens_in=sum(len(tokens) for tokens in batch),
+                  padded_tokens=longest * len(batch)) as s:
+            outputs = translator.translate_batch(batch, target_prefix=[target_prefix] * len(batch), **options)
+            s.tokens_out = sum(len(output.hypotheses[0]) for output in outputs)
+        for i, output in zip(indices, outputs):
+            target_tokens = output.hypotheses[0][1:] # Drop the forced target-language token
+            results[i] = tokenizer.decode(tokenizer.convert_tokens_to_ids(target_tokens), skip_special_tokens=True)
+    return results
+
+
+def main():
+    import sacrebleu
+    from corpus import add_corpus_arguments, load_corpus_from_args
+
+    parser = argparse.ArgumentParser(description="Export M2M100 to CTranslate2 and check parity with PyTorch.")
+    parser.add_argument("--model", default="facebook/m2m100_418M")
+    parser.add_argument("--compute-type", default="int8", choices=CT2_COMPUTE_TYPES)
+    parser.add_argument("--decoding", default="greedy", choices=list(DECODING_PROFILES))
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    sources, references = load_corpus_from_args(args)
+    print(f"Loaded {len(sources)} sentence pairs.")
+
+    tokenizer, model = load_m2m_model(args.model)
+    start = time.perf_counter()
+    torch_outputs = translate_m2m(sources, tokenizer, model, args.src, args.tgt, max_tokens=1024, decoding=args.decoding)
+    torch_seconds = time.perf_counter() - start
+    del model
+
+    tokenizer, translator = load_m2m_ct2(args.model, args.compute_type)
+    start = time.perf_counter()
+    ct2_outputs = translate_m2m_ct2(sources, tokenizer, translator, args.src, args.tgt, decoding=args.decoding)
+    ct2_seconds = time.perf_counter() - start
+
+    exact = sum(a == b for a, b in zip(torch_outputs, ct2_outputs))
+    print(f"\n=== {args.model}: PyTorch fp32 vs CTranslate2 {args.compute_type} ({args.decoding}) ===")
+    print(f"Identical outputs: {exact}/{len(sources)}")
+    print(f"BLEU of CTranslate2 against PyTorch outputs: {sacrebleu.corpus_bleu(ct2_outputs, [torch_outputs]).score:.2f}")
+    print(f"BLEU vs references: PyTorch {sacrebleu.corpus_bleu(torch_outputs, [references]).score:.2f}, "
+          f"CTranslate2 {sacrebleu.corpus_bleu(ct2_outputs, [references]).score:.2f}")
+    print(f"Time: PyTorch {torch_seconds:.1f}s, CTranslate2 {ct2_seconds:.1f}s "
+          f"({torch_seconds / ct2_seconds if ct2_seconds else float('inf'):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
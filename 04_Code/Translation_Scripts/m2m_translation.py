@@ -0,0 +1,254 @@
+# === M2M100 Translation ===
+# Shared loading and batched inference for the facebook/m2m100_* engines used by all language scripts.
+# torch/transformers are imported on first use, so runs served entirely from the cache never pay for them.
+# precision="int8" (dynamic quantization of the Linear layers) or "bf16" trades a little BLEU for CPU
+# throughput and memory; the converted model is cached on disk so the conversion only happens once.
+import os
+import threading
+import weakref
+from functools import partial
+from model_registry import ModelRegistry
+from instrumentation import instrumented, span
+
+# Approximate resident size (fp32 weights plus generation working memory), used to schedule local engines
+MODEL_MEMORY_GB = {
+    "facebook/m2m100_1.2B": 6.0,
+    "facebook/m2m100_418M": 2.5,
+}
+# Short engine names used by the benchmark tools and the translation server
+M2M_ENGINES = {
+    "m2m1b": "facebook/m2m100_1.2B",
+    "m2m418m": "facebook/m2m100_418M",
+}
+PRECISIONS = ("fp32", "int8", "bf16")
+RUNTIMES = ("pytorch", "ctranslate2")
+# Embeddings stay fp32 under dynamic quantization, so int8 saves less than 4x overall
+PRECISION_MEMORY_FACTOR = {"fp32": 1.0, "int8": 0.45, "bf16": 0.5}
+QUANTIZED_CACHE_DIR = os.path.join('..', '..', '06_Results', 'quantized_models')
+
+# Decoding operating points for translate_m2m. "default" keeps the model's own generation config
+# (beam search, fixed max_length). The others cap output length relative to the longest source in
+# the batch (max_len_ratio * src_len + max_len_offset new tokens) and always decode with the KV cache.
+DECODING_PROFILES = {
+    "default": {},
+    "greedy": {"num_beams": 1, "max_len_ratio": 1.5, "max_len_offset": 10},
+    "beam2": {"num_beams": 2, "early_stopping": True, "max_len_ratio": 1.5, "max_len_offset": 10},
+    "beam4": {"num_beams": 4, "early_stopping": True, "max_len_ratio": 2.0, "max_len_offset": 10},
+    "beam5_full": {"num_beams": 5, "early_stopping": False, "max_len_ratio": 2.0, "max_len_offset": 20},
+}
+
+_device = None
+_tokenizer_locks = weakref.WeakKeyDictionary() # tokenizer -> Lock guarding its src_lang
+_tokenizer_locks_guard = threading.Lock()
+
+
+# === Device Setup ===
+def get_device():
+    global _device
+    if _device is None:
+        import torch
+        _device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    return _device
+
+
+def model_key(model_name, precision="fp32"):
+    """Identifies a model variant in the registry and translation cache; fp32 keeps the plain name."""
+    return model_name if precision == "fp32" else f"{model_name}@{precision}"
+
+
+def translation_id(model_name, precision="fp32", decoding="default", runtime="pytorch"):
+    """Identifies everything that changes M2M100 output, for use as the translation-cache model name."""
+    key = model_key(model_name, precision)
+    if runtime != "pytorch":
+        key = f"{key}+{runtime}"
+    return key if decoding == "default" else f"{key}#{decoding}"
+
+
+def estimated_memory_gb(model_name, precision="fp32"):
+    return MODEL_MEMORY_GB[model_name] * PRECISION_MEMORY_FACTOR[precision]
+
+
+def _quantized_cache_path(model_name, precision):
+    import torch
+
+    # The pickled module is tied to the torch version that produced it
+    file_name = f"{model_name.replace('/', '__')}-{precision}-torch{torch.__version__}.pt"
+    return os.path.join(QUANTIZED_CACHE_DIR, file_name)
+
+
+def _convert_precision(model, precision):
+    import torch
+
+    if precision == "int8":
+        # Dynamic int8 kernels are CPU-only; activations are quantized on the fly per batch
+        return torch.ao.quantization.quantize_dynamic(model.to("cpu"), {torch.nn.Linear}, dtype=torch.qint8)
+    return model.to(torch.bfloat16)
+
+
+def load_m2m_model(model_name, precision="fp32"):
+    import torch
+    from transformers import M2M100ForConditionalGeneration, M2M100Tokenizer
+
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}'. Available: {', '.join(PRECISIONS)}")
+    device = torch.device("cpu") if precision == "int8" else get_device()
+    print(f"Loading {model_name} ({precision}) on {device}...")
+    tokenizer = M2M100Tokenizer.from_pretrained(model_name)
+
+    if precision == "fp32":
+        model = M2M100ForConditionalGeneration.from_pretrained(model_name).to(device)
+    else:
+        cache_path = _quantized_cache_path(model_name, precision)
+        if os.path.exists(cache_path):
+            model = torch.load(cache_path, weights_only=False)
+        else:
+            model = _convert_precision(M2M100ForConditionalGeneration.from_pretrained(model_name), precision)
+            os.makedirs(QUANTIZED_CACHE_DIR, exist_ok=True)
+            torch.save(model, cache_path)
+        model = model.to(device)
+    model.eval()
+    print(f"Finished loading {model_name} ({precision}).")
+    return tokenizer, model
+
+
+def model_size_mb(model):
+    """Serialized size of a model's weights, which also counts packed int8 Linear weights."""
+    import io
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes / 1024 ** 2
+
+
+def _release_cuda_memory(_):
+    if get_device().type == "cuda":
+        import torch
+        torch.cuda.empty_cache()
+
+
+# Model variants are registered on first request and only loaded when an engine actually asks for them
+model_registry = ModelRegistry()
+
+
+def get_m2m_model(model_name, precision="fp32"):
+    """Returns (tokenizer, model) for model_name, loading it through the shared LRU registry on first use."""
+    key = model_key(model_name, precision)
+    with model_registry.lock:
+        if key not in model_registry.loaders:
+            model_registry.register(key, partial(load_m2m_model, model_name, precision),
+                                    estimated_memory_gb(model_name, precision), unload=_release_cuda_memory)
+    return model_registry.get(key)
+
+
+def release_model(model_name, precision="fp32", runtime="pytorch"):
+    """Evicts a model variant from the registry, if it is resident, to free its memory for other engines."""
+    if runtime == "ctranslate2":
+        from m2m_ctranslate2 import CT2_COMPUTE_TYPE_FOR_PRECISION, ct2_model_key
+
+        model_registry.evict(ct2_model_key(model_name, CT2_COMPUTE_TYPE_FOR_PRECISION[precision]))
+    else:
+        model_registry.evict(model_key(model_name, precision))
+
+
+def make_length_batches(lengths, max_tokens, max_batch_size=None):
+    """Groups sentence indices by length so each padded batch stays within max_tokens."""
+    # Longest first, so an out-of-memory batch shows up at the start of a run rather than the end
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    batches = []
+    batch = []
+    batch_len = 0
+    for i in order:
+        padded_len = max(batch_len, lengths[i])
+        too_many_tokens = padded_len * (len(batch) + 1) > max_tokens
+        too_many_sentences = max_batch_size is not None and len(batch) >= max_batch_size
+        if batch and (too_many_tokens or too_many_sentences):
+            batches.append(batch)
+            batch = []
+            padded_len = lengths[i]
+        batch.append(i)
+        batch_len = padded_len
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def generation_kwargs(decoding, src_len):
+    """Turns a decoding profile (name or dict) into model.generate keyword arguments for one batch."""
+    profile = dict(DECODING_PROFILES[decoding] if isinstance(decoding, str) else decoding)
+    ratio = profile.pop("max_len_ratio", None)
+    offset = profile.pop("max_len_offset", 0)
+    if ratio is not None:
+        profile["max_new_tokens"] = int(ratio * src_len) + offset
+    if profile:
+        profile.setdefault("do_sample", False)
+        profile.setdefault("use_cache", True)
+    return profile
+
+
+def encode_source(tokenizer, src_lang, encode):
+    """Runs encode(tokenizer) with tokenizer.src_lang set to src_lang.
+
+    src_lang is state on the tokenizer, which is shared by everyone using the same registry model, so
+    setting it and tokenizing are done under a per-tokenizer lock; generation itself runs unlocked.
+    """
+    with _tokenizer_locks_guard:
+        lock = _tokenizer_locks.setdefault(tokenizer, threading.Lock())
+    with lock:
+        tokenizer.src_lang = src_lang
+        return encode(tokenizer)
+
+
+def _generate(batch, tokenizer, model, src_lang, tgt_lang, decoding="default"):
+    encoded = encode_source(tokenizer, src_lang,
+                            lambda tok: tok(batch, return_tensors="pt", padding=True, truncation=True))
+    encoded = encoded.to(model.device)
+    attention_mask = encoded["attention_mask"]
+    with span("m2m.generate", sentences=len(batch), tokens_in=int(attention_mask.sum()),
+              padded_tokens=attention_mask.numel()) as s:
+        generated = model.generate(**encoded, forced_bos_token_id=tokenizer.get_lang_id(tgt_lang),
+                                   **generation_kwargs(decoding, encoded["input_ids"].shape[1]))
+        s.tokens_out = int((generated != tokenizer.pad_token_id).sum())
+    return tokenizer.batch_decode(generated, skip_special_tokens=True)
+
+
+@instrumented("m2m.translate")
+def translate_m2m(sentences, tokenizer, model, src_lang, tgt_lang, batch_size=4, max_tokens=None, decoding="default"):
+    """Translates sentences with an M2M100 model, returning results in input order.
+
+    With max_tokens set, sentences are bucketed by tokenized length and batched by a padded
+    token budget instead of a fixed sentence count, which keeps pad tokens to a minimum.
+    decoding selects a DECODING_PROFILES entry (or a dict in the same format).
+    """
+    if max_tokens is None:
+        results = []
+        for i in range(0, len(sentences), batch_size):
+            batch = sentences[i:i+batch_size]
+            if not batch:
+                continue
+            results.extend(_generate(batch, tokenizer, model, src_lang, tgt_lang, decoding))
+        return results
+
+    input_ids = encode_source(tokenizer, src_lang, lambda tok: tok(list(sentences), truncation=True)["input_ids"])
+    lengths = [len(ids) for ids in input_ids]
+    results = [None] * len(sentences)
+    for indices in make_length_batches(lengths, max_tokens):
+        decoded = _generate([sentences[i] for i in indices], tokenizer, model, src_lang, tgt_lang, decoding)
+        for i, text in zip(indices, decoded):
+            results[i] = text
+    return results
+
+
+def translate_with_model(model_name, sentences, src_lang, tgt_lang, precision="fp32", decoding="default",
+                         runtime="pytorch", max_tokens=1024):
+    """Translates with an M2M100 variant on the chosen runtime, loading it through the model registry."""
+    if runtime == "ctranslate2":
+        from m2m_ctranslate2 import CT2_COMPUTE_TYPE_FOR_PRECISION, get_m2m_ct2, translate_m2m_ct2
+
+        tokenizer, translator = get_m2m_ct2(model_name, CT2_COMPUTE_TYPE_FOR_PRECISION[precision])
+        return translate_m2m_ct2(sentences, tokenizer, translator, src_lang, tgt_lang,
+                                 max_tokens=max_tokens, decoding=decoding)
+    if runtime != "pytorch":
+        raise ValueError(f"Unknown runtime '{runtime}'. Available: {', '.join(RUNTIMES)}")
+    tokenizer, model = get_m2m_model(model_name, precision)
+    return translate_m2m(sentences, tokenizer, model, src_lang, tgt_lang, max_tokens=max_tokens, decoding=decoding)
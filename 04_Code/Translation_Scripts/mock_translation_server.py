@@ -0,0 +1,95 @@
+# === Mock Translation Server ===
+# Local stand-in for the Google Translate web endpoint and a LibreTranslate server, used to exercise
+# the remote backends without network access or rate limits. Translations are just "[tgt] source".
+# The LibreTranslate endpoint accepts a list of `q` like the real server and rejects any request
+# containing FAIL_MARKER with a 400, to exercise per-item error handling.
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+FAIL_MARKER = "[FAIL]"
+
+
+def mock_translation(text, tgt_lang):
+    return f"[{tgt_lang}] {text}"
+
+
+class MockTranslationHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, so clients can reuse pooled connections
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _simulate_load(self):
+        """Sleeps for the configured latency and returns True if this request should fail with a 429."""
+        self.server.request_count += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            self._send_json(429, {"error": "Too many requests"})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/translate_a/single":
+            self._send_json(404, {"error": "Not found"})
+            return
+        if self._simulate_load():
+            return
+        params = parse_qs(url.query)
+        text = params.get("q", [""])[0]
+        translated = mock_translation(text, params.get("tl", [""])[0])
+        self._send_json(200, [[[translated, text, None, None]], None, params.get("sl", [""])[0]])
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if urlparse(self.path).path != "/translate":
+            self._send_json(404, {"error": "Not found"})
+            return
+        if self._simulate_load():
+            return
+        q = payload.get("q", "")
+        texts = q if isinstance(q, list) else [q]
+        if any(FAIL_MARKER in text for text in texts):
+            self._send_json(400, {"error": "Invalid request"})
+            return
+        translated = [mock_translation(text, payload.get("target", "")) for text in texts]
+        self._send_json(200, {"translatedText": translated if isinstance(q, list) else translated[0]})
+
+    def log_message(self, format, *args):
+        pass # Keep benchmark output clean
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128 # Benchmarks open many connections at once; the default backlog of 5 resets them
+
+
+def start_mock_server(host="127.0.0.1", port=0, latency=0.0, error_rate=0.0):
+    """Starts the mock server on a background thread and returns (server, base_url)."""
+    server = MockHTTPServer((host, port), MockTranslationHandler)
+    server.latency = latency
+    server.error_rate = error_rate
+    server.request_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    server, base_url = start_mock_server(port=5000)
+    print(f"Mock Google/LibreTranslate server listening on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,95 @@
+# === Model Registry ===
+# Loads models lazily on first use and keeps the most recently used ones resident within a memory
+# budget, evicting the least recently used model when a new one would not fit.
+import gc
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def available_memory_gb():
+    """Returns physical memory in GB, or None where it cannot be determined."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 ** 3
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def default_memory_budget_gb():
+    # Leave headroom for the OS and Python itself
+    return (available_memory_gb() or 8.0) * 0.8
+
+
+class ModelRegistry:
+    """Name -> model cache with on-demand loading and LRU eviction under a memory budget (in GB)."""
+
+    def __init__(self, memory_budget_gb=None):
+        self.memory_budget_gb = memory_budget_gb if memory_budget_gb is not None else default_memory_budget_gb()
+        self.loaders = {}
+        self.loaded = OrderedDict()
+        self.loading = {} # name -> Future for models being loaded right now
+        self.lock = threading.RLock()
+
+    def register(self, name, loader, memory_gb, unload=None):
+        """Registers a zero-argument loader; nothing is loaded until get(name) is first called."""
+        self.loaders[name] = (loader, memory_gb, unload)
+
+    def resident_gb(self):
+        """Memory of the resident models plus the ones currently loading."""
+        return sum(self.loaders[name][1] for name in list(self.loaded) + list(self.loading))
+
+    def get(self, name):
+        """Returns the model for name, loading it (and evicting LRU models to make room) if needed.
+
+        The load itself runs outside the registry lock, so requests for models that are already
+        resident never wait on it; concurrent requests for the same model wait for that one load.
+        """
+        with self.lock:
+            if name in self.loaded:
+                self.loaded.move_to_end(name)
+                return self.loaded[name]
+            if name not in self.loaders:
+                raise KeyError(f"No model registered under '{name}'")
+            pending = self.loading.get(name)
+            if pending is None:
+                loader, memory_gb, _ = self.loaders[name]
+                while self.loaded and self.resident_gb() + memory_gb > self.memory_budget_gb:
+                    self.evict(next(iter(self.loaded)))
+                pending = self.loading[name] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return pending.result()
+
+        try:
+            model = loader()
+        except BaseException as e:
+            with self.lock:
+                del self.loading[name]
+            pending.set_exception(e)
+            raise
+        with self.lock:
+            del self.loading[name]
+            self.loaded[name] = model
+        pending.set_result(model)
+        return model
+
+    def evict(self, name):
+        """Drops a resident model. Callers still holding a reference keep it alive until they finish."""
+        with self.lock:
+            model = self.loaded.pop(name, None)
+            if model is None:
+                return
+            print(f"Evicting {name} from memory.")
+            unload = self.loaders[name][2]
+            if unload:
+                unload(model)
+            del model
+            gc.collect()
+
+    def clear(self):
+        with self.lock:
+            for name in list(self.loaded):
+                self.evict(name)
@@ -0,0 +1,193 @@
+# === Checkpointed Output Writer ===
+# Streams translations to the raw output files chunk by chunk instead of writing them once the whole
+# corpus is done. After each chunk the data file is fsync'd, then a record with the number of completed
+# sentences and the byte offset is appended (and fsync'd) to a sidecar index (<output>.idx).
+# Re-opening the file resumes after the last recorded chunk; anything past it is a torn write and is truncated.
+# "[ERROR]" lines from earlier runs are translated again on resume, like the translation cache never storing them.
+import hashlib
+import json
+import os
+
+DEFAULT_CHUNK_SIZE = 128
+ERROR = "[ERROR]"
+
+
+def corpus_fingerprint(sentences):
+    """Identifies the source corpus, so a checkpoint is only resumed for the same input."""
+    digest = hashlib.sha256()
+    for s in sentences:
+        digest.update(s.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _fsync_append(f, data):
+    f.write(data)
+    f.flush()
+    os.fsync(f.fileno())
+
+
+class CheckpointedWriter:
+    """Appends one translation per line in fsync'd chunks and records progress in a sidecar index."""
+
+    def __init__(self, path, meta=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.meta = meta or {}
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.completed, offset, index_end = self._load_checkpoint()
+
+        self.data_file = open(path, "r+b" if os.path.exists(path) else "wb")
+        self.data_file.truncate(offset)
+        self.data_file.seek(offset)
+        if self.completed == 0:
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                _fsync_append(f, json.dumps({"meta": self.meta}) + "\n")
+        else:
+            os.truncate(self.index_path, index_end)
+        self.index_file = open(self.index_path, "a", encoding="utf-8")
+        if self.completed:
+            print(f"Resuming {os.path.basename(path)} after {self.completed} sentences")
+
+    def _load_checkpoint(self):
+        """Returns (completed sentences, data offset, index offset) of the last intact record for matching meta."""
+        if not (os.path.exists(self.path) and os.path.exists(self.index_path)):
+            return 0, 0, 0
+        completed, offset, index_end = 0, 0, 0
+        with open(self.index_path, "rb") as f:
+            for i, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break # Torn final record from a crash mid-write
+                if not line.endswith(b"\n"):
+                    break
+                index_end += len(line)
+                if i == 0:
+                    if record.get("meta") != self.meta:
+                        return 0, 0, 0 # Different corpus or engine settings: start over
+                    continue
+                completed, offset = record["sentences"], record["offset"]
+        if index_end == 0 or os.path.getsize(self.path) < offset:
+            return 0, 0, 0
+        return completed, offset, index_end
+
+    def write(self, translations):
+        """Buffers translations and checkpoints every full chunk."""
+        self.buffer.extend(translations)
+        while len(self.buffer) >= self.chunk_size:
+            self._flush_chunk(self.buffer[:self.chunk_size])
+            del self.buffer[:self.chunk_size]
+
+    def _flush_chunk(self, chunk):
+        # One translation per line: embedded newlines would shift the alignment with the source file
+        lines = "".join(" ".join(s.splitlines()) + "\n" for s in chunk)
+        _fsync_append(self.data_file, lines.encode("utf-8"))
+        self.completed += len(chunk)
+        _fsync_append(self.index_file, json.dumps({"sentences": self.completed, "offset": self.data_file.tell()}) + "\n")
+
+    def close(self):
+        if self.buffer:
+            self._flush_chunk(self.buffer)
+            self.buffer = []
+        self.data_file.close()
+        self.index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Keep only fully checkpointed chunks; the buffered remainder is redone on the next run
+            self.data_file.close()
+            self.index_file.close()
+
+
+def read_output(path):
+    """Reads back a raw output file written by CheckpointedWriter as a list of translations."""
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f]
+
+
+def _rewrite_output(path, translations, meta, chunk_size):
+    """Replaces the output file and its index with a complete checkpoint of translations."""
+    tmp_path = path + ".tmp"
+    with CheckpointedWriter(tmp_path, meta=meta, chunk_size=chunk_size) as writer:
+        writer.write(translations)
+    # Drop the old index first: a crash between the renames then means starting over, never a
+    # checkpoint whose offsets point into the wrong file
+    os.remove(path + ".idx")
+    os.replace(tmp_path, path)
+    os.replace(tmp_path + ".idx", path + ".idx")
+
+
+def translate_resumable(path, sentences, translate_fn, chunk_size=DEFAULT_CHUNK_SIZE, meta=None):
+    """Translates sentences chunk by chunk into path, skipping chunks a previous run already completed.
+
+    Sentences a previous run left as "[ERROR]" are sent to translate_fn again, and the file is rewritten
+    if any of them now succeed. Returns all translations in input order.
+    """
+    meta = dict(meta or {}, sources=corpus_fingerprint(sentences), count=len(sentences), chunk_size=chunk_size)
+    with CheckpointedWriter(path, meta=meta, chunk_size=chunk_size) as writer:
+        resumed = writer.completed
+        for start in range(writer.completed, len(sentences), chunk_size):
+            writer.write(translate_fn(sentences[start:start + chunk_size]))
+    translations = read_output(path)
+
+    # Sentences translated in this run already had their retries; only earlier failures are retried
+    failed = [i for i in range(resumed) if translations[i] == ERROR]
+    if failed:
+        print(f"Retrying {len(failed)} failed sentences from a previous run of {os.path.basename(path)}")
+        retried = []
+        for start in range(0, len(failed), chunk_size):
+            retried.extend(translate_fn([sentences[i] for i in failed[start:start + chunk_size]]))
+        fixed = 0
+        for i, text in zip(failed, retried):
+            if text != ERROR:
+                translations[i] = text
+                fixed += 1
+        if fixed:
+            _rewrite_output(path, translations, meta, chunk_size)
+    return translations
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    # Failure followed by recovery: errors written by a failing run are retried by the next one
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "raw_output.txt")
+        sentences = [f"Sentence {i}." for i in range(20)]
+        calls = []
+
+        def failing(batch):
+            calls.append(list(batch))
+            return [ERROR] * len(batch)
+
+        def working(batch):
+            calls.append(list(batch))
+            return [s.upper() for s in batch]
+
+        first = translate_resumable(path, sentences, failing, chunk_size=8)
+        assert first == [ERROR] * 20 and len(calls) == 3
+
+        calls.clear()
+        second = translate_resumable(path, sentences, working, chunk_size=8)
+        assert second == [s.upper() for s in sentences], second
+        assert read_output(path) == second
+        assert sorted(s for batch in calls for s in batch) == sorted(sentences)
+
+        # Nothing left to retry: a third run translates nothing and keeps the file
+        calls.clear()
+        assert translate_resumable(path, sentences, working, chunk_size=8) == second and not calls
+
+        # A partly failed run: only the failed sentences are sent again
+        os.remove(path)
+        translate_resumable(path, sentences, lambda b: [ERROR if "3" in s else s.upper() for s in b], chunk_size=8)
+        calls.clear()
+        assert translate_resumable(path, sentences, working, chunk_size=8) == [s.upper() for s in sentences]
+        assert calls == [["Sentence 3.", "Sentence 13."]], calls
+    print("✅ Failed sentences are retried on resume")
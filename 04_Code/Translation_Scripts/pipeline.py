@@ -0,0 +1,289 @@
+# === Translation Benchmark Pipeline ===
+# One parameterized run for every language pair: load a corpus slice, translate it with each engine
+# concurrently (cached, checkpointed), score BLEU with bootstrap CIs, append per-sentence rows to the
+# results store and write a latency report. Pairs run one after another in the same process, so an
+# M2M100 model loaded for the first pair stays warm in the model registry for the next ones.
+#
+# Example (from 04_Code/Translation_Scripts/):
+#   python pipeline.py                                   # all built-in pairs
+#   python pipeline.py --pairs hindi_english --limit 200 --engines m2m418m google --precision int8
+#   python pipeline.py --config my_pipeline.json         # {"settings": {...}, "pairs": {"name": {...}}}
+import argparse
+import copy
+import json
+import os
+from functools import partial
+from argos_parallel import ensure_argos_package, translate_argos_parallel
+from corpus import load_corpus
+from engine_scheduler import EngineJob, run_engines
+from instrumentation import metrics
+from m2m_translation import (DECODING_PROFILES, M2M_ENGINES, PRECISIONS, RUNTIMES, estimated_memory_gb,
+                             model_registry, release_model, translate_with_model, translation_id)
+from output_writer import translate_resumable
+from remote_backends import GOOGLE_URL, translate_google_concurrent, translate_libre_batched
+from results_store import ResultsStore, new_run_id, result_rows
+from scoring import CorpusScorer
+from significance import significance_report
+from translation_cache import TranslationCache, cached_translate
+
+DATA_DIR = os.path.join('..', '..', '05_Data')
+RESULTS_DIR = os.path.join('..', '..', '06_Results')
+
+ENGINE_DISPLAY_NAMES = {
+    "google": "Google Translate",
+    "argos": "Argos Translate",
+    "m2m1b": "M2M100 1.2B",
+    "m2m418m": "M2M100 418M",
+    "libretranslate": "LibreTranslate",
+}
+# (engine, model) recorded in the translation cache. Google goes through the gtx web endpoint
+# (remote_backends), not the googletrans library, so its id differs from entries cached by the old scripts.
+CACHE_IDS = {
+    "google": ("google", "google-gtx"),
+    "argos": ("argos", "argostranslate"),
+    "libretranslate": ("libretranslate", "libretranslate"),
+}
+
+DEFAULT_SETTINGS = {
+    "m2m_max_tokens": 1024, # Padded source tokens per length-bucketed batch
+    "m2m_precision": "fp32", # "int8" (CPU dynamic quantization) or "bf16" for faster, smaller CPU inference
+    "m2m_decoding": "default", # Or a DECODING_PROFILES name such as "greedy" or "beam4"
+    "m2m_runtime": "pytorch", # Or "ctranslate2" to serve an exported, CPU-optimized copy
+    "google_url": GOOGLE_URL,
+    "libre_url": "https://b458-49-43-7-49.ngrok-free.app", # Use your own LibreTranslate server, e.g. http://localhost:5000
+    "argos_memory_gb": 2.0, # All Argos worker processes together
+    "memory_budget_gb": None, # None: 80% of physical RAM
+    # Sentences per checkpointed chunk of the raw output files, i.e. per engine call: the most a crash can lose.
+    # Argos shards each chunk over all its workers, and M2M100 length-buckets within it
+    "chunk_size": 256,
+    "bootstrap_samples": 1000,
+}
+
+LANGUAGE_PAIRS = {
+    "hindi_english": {
+        "title": "EN → HI",
+        "src": "en", "tgt": "hi",
+        "corpus": {"format": "parallel", "paths": [os.path.join(DATA_DIR, 'Hindi_English', 'IITB.en-hi.en'),
+                                                   os.path.join(DATA_DIR, 'Hindi_English', 'IITB.en-hi.hi')]},
+        "limit": 50,
+        "engines": ["argos", "m2m1b", "m2m418m", "google", "libretranslate"],
+        "bleu_engines": ["google", "argos", "m2m1b", "m2m418m"], # LibreTranslate has no en-hi model
+        "output_dir": "Hindi_English_Results",
+    },
+    "chinese_english": {
+        "title": "EN → ZH",
+        "src": "en", "tgt": "zh",
+        "corpus": {"format": "jsonl", "paths": [os.path.join(DATA_DIR, 'Chinese_English', 'chinese_english_dataset.jsonl')],
+                   "options": {"src_field": "english", "ref_field": "chinese"}},
+        "limit": 50,
+        "engines": ["argos", "m2m1b", "m2m418m", "google", "libretranslate"],
+        "engine_langs": {"google": ["en", "zh-cn"]}, # zh-cn for Simplified Chinese
+        "output_dir": "Chinese_English_Results",
+    },
+    "burmese_english": {
+        "title": "MY → EN",
+        "src": "my", "tgt": "en",
+        "corpus": {"format": "tmx", "paths": [os.path.join(DATA_DIR, 'Burmese_English', 'en-my.tmx.gz')],
+                   "options": {"src_lang": "my", "tgt_lang": "en"}},
+        "limit": 50,
+        "engines": ["m2m1b", "m2m418m", "google", "libretranslate"], # No Argos my-en package
+        "output_dir": "Burmese_English_Results",
+    },
+}
+
+
+def load_config(path=None):
+    """Returns (settings, pairs): the built-in defaults, with a JSON config file merged over them."""
+    settings, pairs = dict(DEFAULT_SETTINGS), copy.deepcopy(LANGUAGE_PAIRS)
+    if path:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        settings.update(config.get("settings", {}))
+        for name, pair in config.get("pairs", {}).items():
+            pairs[name] = {**pairs.get(name, {}), **pair}
+    return settings, pairs
+
+
+def load_pair_corpus(pair):
+    """Returns (sources, references) for a pair's corpus slice, or None if the dataset is missing."""
+    corpus = pair["corpus"]
+    try:
+        pairs = list(load_corpus(corpus["format"], *corpus["paths"], limit=pair.get("limit"),
+                                 **corpus.get("options", {})))
+    except FileNotFoundError as e:
+        print(f"Error: {e.filename} not found. Please ensure the dataset is in the correct path.")
+        return None
+    if not pairs:
+        print("No sentences loaded. Check dataset.")
+        return None
+    return [src for src, _ in pairs], [ref for _, ref in pairs]
+
+
+def engine_translate_fn(engine, src_lang, tgt_lang, settings):
+    """Uncached translate function for one engine and language pair."""
+    if engine == "argos":
+        def translate_argos(sentences):
+            # Only reaches the Argos package index if the package is not installed yet
+            if not ensure_argos_package(src_lang, tgt_lang):
+                print(f"Argos Translate {src_lang}-{tgt_lang} translation not available or not installed.")
+                return ["[ERROR]" for _ in sentences]
+            # One translator per worker process; shards shrink so even a small chunk reaches every core
+            shard_size = max(1, min(32, -(-len(sentences) // (os.cpu_count() or 1))))
+            return translate_argos_parallel(sentences, src_lang, tgt_lang, shard_size=shard_size)
+        return translate_argos
+    if engine in M2M_ENGINES:
+        # Loaded on first use through the model registry and kept warm for later pairs
+        return lambda sentences: translate_with_model(M2M_ENGINES[engine], sentences, src_lang, tgt_lang,
+                                                      precision=settings["m2m_precision"],
+                                                      decoding=settings["m2m_decoding"],
+                                                      runtime=settings["m2m_runtime"],
+                                                      max_tokens=settings["m2m_max_tokens"])
+    if engine == "google":
+        return lambda sentences: translate_google_concurrent(sentences, src_lang, tgt_lang, base_url=settings["google_url"])
+    if engine == "libretranslate":
+        return lambda sentences: translate_libre_batched(sentences, src_lang, tgt_lang, settings["libre_url"])
+    raise ValueError(f"Unknown engine '{engine}'. Available: {', '.join(ENGINE_DISPLAY_NAMES)}")
+
+
+def build_engine_jobs(name, pair, settings, cache, output_dir):
+    """EngineJobs for a pair: each engine goes through the translation cache and a checkpointed output file."""
+    m2m_settings = [settings["m2m_precision"], settings["m2m_decoding"], settings["m2m_runtime"]]
+    jobs = []
+    for engine in pair["engines"]:
+        src_lang, tgt_lang = pair.get("engine_langs", {}).get(engine, (pair["src"], pair["tgt"]))
+        release = None
+        if engine in M2M_ENGINES:
+            cache_engine = "m2m100"
+            cache_model = translation_id(M2M_ENGINES[engine], *m2m_settings)
+            kind, memory_gb = "local", estimated_memory_gb(M2M_ENGINES[engine], settings["m2m_precision"])
+            release = partial(release_model, M2M_ENGINES[engine], settings["m2m_precision"], settings["m2m_runtime"])
+        else:
+            cache_engine, cache_model = CACHE_IDS[engine]
+            kind, memory_gb = ("local", settings["argos_memory_gb"]) if engine == "argos" else ("remote", 0.0)
+
+        translate_fn = engine_translate_fn(engine, src_lang, tgt_lang, settings)
+        cached = (lambda s, e=cache_engine, m=cache_model, sl=src_lang, tl=tgt_lang, fn=translate_fn:
+                  cached_translate(cache, e, m, sl, tl, s, fn))
+        path = os.path.join(output_dir, f'{name}_raw_output_{engine}.txt')
+        meta = {"engine": engine, "m2m": m2m_settings} # A settings change restarts the file
+        resumable = (lambda s, path=path, meta=meta, fn=cached:
+                     translate_resumable(path, s, fn, chunk_size=settings["chunk_size"], meta=meta))
+        jobs.append(EngineJob(engine, resumable, kind=kind, memory_gb=memory_gb, release=release))
+    return jobs
+
+
+def report_bleu(name, pair, translations, references, output_dir, settings):
+    """BLEU with 95% bootstrap CIs and paired p-values against the baseline engine, printed and saved as CSV."""
+    bleu_engines = [e for e in pair.get("bleu_engines", pair["engines"]) if e in translations]
+    baseline = pair.get("baseline", "google")
+    if not bleu_engines:
+        print(f"\n⚠️ No BLEU engines produced translations for {pair['title']}; skipping BLEU scores.")
+        return
+    scorers = {}
+    for engine in bleu_engines:
+        hypotheses = [str(h) if isinstance(h, str) else "" for h in translations[engine]]
+        scorers[ENGINE_DISPLAY_NAMES[engine]] = CorpusScorer("bleu").update(hypotheses, references)
+    baseline_name = ENGINE_DISPLAY_NAMES[baseline] if baseline in bleu_engines else None
+    bleu_report = significance_report(scorers, baseline=baseline_name, n_samples=settings["bootstrap_samples"])
+
+    print(f"\n=== BLEU SCORES ({pair['title']}) ===")
+    for row in bleu_report:
+        significance = "" if row["p_value"] is None else f", p = {row['p_value']:.3f} vs {row['baseline']}"
+        print(f"{row['system']}: {row['score']:.2f} (95% CI {row['ci_low']:.2f}–{row['ci_high']:.2f}{significance})")
+
+    csv_path = os.path.join(output_dir, f'{name}_bleu_scores.csv')
+    baseline_column = bleu_report[0]["baseline"].split()[0] if bleu_report else "Baseline"
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write(f"Model,BLEU_Score,CI_Low,CI_High,P_Value_vs_{baseline_column}\n")
+        for row in bleu_report:
+            p_value = "" if row["p_value"] is None else f"{row['p_value']:.4f}"
+            f.write(f"{row['system']},{row['score']:.2f},{row['ci_low']:.2f},{row['ci_high']:.2f},{p_value}\n")
+    print(f"\n✅ BLEU scores saved to {csv_path}")
+
+
+def run_pair(name, pair, settings, cache, results_store, run_id):
+    print(f"\n##### {name} ({pair['title']}) #####")
+    corpus = load_pair_corpus(pair)
+    if corpus is None:
+        return None
+    sources, references = corpus
+    print(f"Loaded {len(sources)} sentence pairs.")
+    print("🔍 Example:")
+    print(f"{pair['src'].upper()}:", sources[0])
+    print(f"{pair['tgt'].upper()}:", references[0])
+
+    output_dir = os.path.join(RESULTS_DIR, pair["output_dir"])
+    os.makedirs(output_dir, exist_ok=True)
+    metrics.reset() # Each pair gets its own latency report
+
+    jobs = build_engine_jobs(name, pair, settings, cache, output_dir)
+    translations, engine_seconds = run_engines(jobs, sources, memory_budget_gb=settings["memory_budget_gb"])
+
+    report_bleu(name, pair, translations, references, output_dir, settings)
+
+    # Only batch timings exist per engine, so each sentence gets the engine's average latency
+    for engine, engine_translations in translations.items():
+        results_store.append(result_rows(run_id, engine, pair["src"], pair["tgt"], sources, references,
+                                         engine_translations, latency_ms=1000 * engine_seconds[engine] / len(sources)))
+    print(f"Per-sentence results for run {run_id} appended to {results_store.root}")
+
+    latency_report_path = metrics.write_report(os.path.join(output_dir, f'{name}_latency_report.json'))
+    print(f"Latency report saved to {latency_report_path}")
+    return translations
+
+
+def run_pipeline(pair_names=None, settings=None, pairs=None):
+    """Runs the given language pairs (all configured pairs by default) in one process."""
+    default_settings, default_pairs = load_config()
+    settings = settings or default_settings
+    pairs = pairs or default_pairs
+    if settings["memory_budget_gb"] is not None:
+        # One budget for the scheduler's reservations and for the models the registry keeps resident
+        model_registry.memory_budget_gb = settings["memory_budget_gb"]
+    cache = TranslationCache() # Shared on-disk cache: only unseen sentences reach the engines
+    results_store = ResultsStore()
+    run_id = new_run_id()
+    results = {}
+    try:
+        for name in pair_names or list(pairs):
+            if name not in pairs:
+                raise ValueError(f"Unknown language pair '{name}'. Available: {', '.join(pairs)}")
+            results[name] = run_pair(name, pairs[name], settings, cache, results_store, run_id)
+    finally:
+        cache.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the translation benchmark for one or more language pairs.")
+    parser.add_argument("--config", help="JSON file with 'settings' and/or 'pairs' overriding the defaults")
+    parser.add_argument("--pairs", nargs="+", help="Language pairs to run (default: all configured pairs)")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINE_DISPLAY_NAMES),
+                        help="Restrict every pair to these engines")
+    parser.add_argument("--limit", type=int, help="Sentence pairs per language pair")
+    parser.add_argument("--precision", choices=PRECISIONS)
+    parser.add_argument("--decoding", choices=list(DECODING_PROFILES))
+    parser.add_argument("--runtime", choices=RUNTIMES)
+    parser.add_argument("--max-tokens", type=int)
+    parser.add_argument("--google-url", help="e.g. the mock server from mock_translation_server.py")
+    parser.add_argument("--libre-url")
+    parser.add_argument("--memory-budget-gb", type=float)
+    parser.add_argument("--chunk-size", type=int, help="Sentences per checkpointed engine call (default 256)")
+    args = parser.parse_args()
+
+    settings, pairs = load_config(args.config)
+    for key, value in {"m2m_precision": args.precision, "m2m_decoding": args.decoding, "m2m_runtime": args.runtime,
+                       "m2m_max_tokens": args.max_tokens, "google_url": args.google_url, "libre_url": args.libre_url,
+                       "memory_budget_gb": args.memory_budget_gb, "chunk_size": args.chunk_size}.items():
+        if value is not None:
+            settings[key] = value
+    for pair in pairs.values():
+        if args.limit is not None:
+            pair["limit"] = args.limit
+        if args.engines:
+            pair["engines"] = [e for e in pair["engines"] if e in args.engines]
+    run_pipeline(args.pairs, settings, pairs)
+
+
+if __name__ == "__main__":
+    main()
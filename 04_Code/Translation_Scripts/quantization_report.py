@@ -0,0 +1,63 @@
+# === Quantization Report ===
+# Compares reduced-precision M2M100 inference against fp32 on a corpus slice: BLEU delta, CPU
+# throughput and weight size per precision, written to a CSV next to the other results.
+#
+# Example (from 04_Code/Translation_Scripts/):
+#   python quantization_report.py --model facebook/m2m100_418M --format parallel \
+#       --paths ../../05_Data/Hindi_English/IITB.en-hi.en ../../05_Data/Hindi_English/IITB.en-hi.hi \
+#       --src en --tgt hi --limit 200
+import argparse
+import os
+import time
+import sacrebleu
+from corpus import add_corpus_arguments, load_corpus_from_args
+from m2m_translation import PRECISIONS, load_m2m_model, model_size_mb, translate_m2m
+
+
+def compute_bleu(hypotheses, references):
+    return sacrebleu.corpus_bleu(hypotheses, [references]).score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BLEU/throughput report for quantized M2M100 inference.")
+    parser.add_argument("--model", default="facebook/m2m100_418M")
+    parser.add_argument("--precisions", nargs="+", default=["fp32", "int8", "bf16"], choices=PRECISIONS)
+    add_corpus_arguments(parser)
+    parser.add_argument("--max-tokens", type=int, default=1024)
+    parser.add_argument("--output", default=os.path.join('..', '..', '06_Results', 'quantization_report.csv'))
+    args = parser.parse_args()
+
+    sources, references = load_corpus_from_args(args)
+    print(f"Loaded {len(sources)} sentence pairs.")
+
+    rows = []
+    for precision in args.precisions:
+        tokenizer, model = load_m2m_model(args.model, precision)
+        start = time.perf_counter()
+        hypotheses = translate_m2m(sources, tokenizer, model, src_lang=args.src, tgt_lang=args.tgt,
+                                   max_tokens=args.max_tokens)
+        seconds = time.perf_counter() - start
+        rows.append({
+            "precision": precision,
+            "bleu": compute_bleu(hypotheses, references),
+            "sentences_per_sec": len(sources) / seconds if seconds else 0.0,
+            "size_mb": model_size_mb(model),
+        })
+        del model
+
+    baseline = next((row["bleu"] for row in rows if row["precision"] == "fp32"), None)
+    print(f"\n=== {args.model} ({args.src} → {args.tgt}, {len(sources)} sentences) ===")
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write("Model,Precision,BLEU_Score,BLEU_Delta_vs_FP32,Sentences_per_sec,Weights_MB\n")
+        for row in rows:
+            delta = row["bleu"] - baseline if baseline is not None else float("nan")
+            print(f"{row['precision']}: BLEU {row['bleu']:.2f} (Δ {delta:+.2f}), "
+                  f"{row['sentences_per_sec']:.2f} sent/s, {row['size_mb']:.0f} MB")
+            f.write(f"{args.model},{row['precision']},{row['bleu']:.2f},{delta:.2f},"
+                    f"{row['sentences_per_sec']:.2f},{row['size_mb']:.0f}\n")
+    print(f"\n✅ Quantization report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# === Remote Translation Backends ===
+# asyncio clients for Google Translate and LibreTranslate that share one pooled HTTP connection,
+# bound the number of in-flight requests, rate-limit with a token bucket and retry with exponential backoff.
+import asyncio
+import random
+import time
+import httpx
+from instrumentation import instrumented, span
+
+GOOGLE_URL = "https://translate.googleapis.com"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+ITEM_ERROR_STATUS = {400, 413, 422} # Rejections caused by the request's content, not the server's state
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` requests per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def _with_retries(send, max_retries, base_delay, max_delay):
+    """Calls send() until it succeeds, backing off exponentially (with jitter) on retryable failures."""
+    for attempt in range(max_retries + 1):
+        try:
+            response = await send()
+            if response.status_code not in RETRY_STATUS:
+                response.raise_for_status()
+                return response
+            error = httpx.HTTPStatusError(f"HTTP {response.status_code}", request=response.request, response=response)
+        except (httpx.TransportError, httpx.TimeoutException) as e:
+            error = e
+        if attempt == max_retries:
+            raise error
+        delay = min(max_delay, base_delay * 2 ** attempt)
+        await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+
+async def _translate_all(sentences, request_one, parse_response, engine_name, concurrency, rate, max_retries, base_delay, max_delay):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = TokenBucket(rate) if rate else None
+
+    span_name = engine_name.lower().replace(" ", "_") + ".request"
+
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        async def worker(text):
+            if not text.strip():
+                return ""
+            async with semaphore:
+                if bucket:
+                    await bucket.acquire()
+                try:
+                    # Timed from the moment the request may go out, so queueing for a slot is not counted
+                    with span(span_name, sentences=1, tokens_in=len(text.split())):
+                        response = await _with_retries(lambda: request_one(client, text), max_retries, base_delay, max_delay)
+                    return parse_response(response)
+                except Exception as e:
+                    print(f"❌ {engine_name} error for '{text[:50]}...': {e}")
+                    return "[ERROR]"
+
+        return await asyncio.gather(*(worker(s) for s in sentences))
+
+
+def _parse_google(response):
+    data = response.json()
+    return "".join(part[0] for part in data[0] if part and part[0])
+
+
+def _parse_libre(response):
+    return response.json()["translatedText"]
+
+
+async def translate_google_async(sentences, src_lang, tgt_lang, base_url=GOOGLE_URL, concurrency=16, rate=20.0,
+                                 max_retries=5, base_delay=0.5, max_delay=30.0):
+    """Translates sentences concurrently through the public Google Translate web endpoint.
+
+    This calls the undocumented translate.googleapis.com "gtx" endpoint directly (the googletrans library
+    is no longer used), so results are cached under their own id; see CACHE_IDS in pipeline.py.
+    """
+    async def request_one(client, text):
+        params = {"client": "gtx", "sl": src_lang, "tl": tgt_lang, "dt": "t", "q": text}
+        return await client.get(f"{base_url}/translate_a/single", params=params)
+
+    return await _translate_all(sentences, request_one, _parse_google, "Google Translate", concurrency, rate,
+                                max_retries, base_delay, max_delay)
+
+
+async def translate_libre_async(sentences, src_lang, tgt_lang, base_url, api_key=None, concurrency=8, rate=None,
+                                max_retries=5, base_delay=0.5, max_delay=30.0):
+    """Translates sentences concurrently against a LibreTranslate server's /translate endpoint."""
+    async def request_one(client, text):
+        payload = {"q": text, "source": src_lang, "target": tgt_lang, "format": "text"}
+        if api_key:
+            payload["api_key"] = api_key
+        return await client.post(f"{base_url}/translate", json=payload)
+
+    return await _translate_all(sentences, request_one, _parse_libre, "LibreTranslate", concurrency, rate,
+                                max_retries, base_delay, max_delay)
+
+
+def _make_batches(indices, sentences, max_items, max_chars):
+    """Splits sentence indices into consecutive batches bounded by item count and total characters."""
+    batches = []
+    batch = []
+    chars = 0
+    for i in indices:
+        size = len(sentences[i])
+        if batch and (len(batch) >= max_items or chars + size > max_chars):
+            batches.append(batch)
+            batch = []
+            chars = 0
+        batch.append(i)
+        chars += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _is_item_error(error):
+    """True if a batch failure points at the batch's content, so splitting it can isolate the bad sentence."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in ITEM_ERROR_STATUS
+    # Count mismatch or an unexpected (but delivered) response body
+    return isinstance(error, (ValueError, KeyError, TypeError))
+
+
+async def translate_libre_batched_async(sentences, src_lang, tgt_lang, base_url, api_key=None, max_batch_items=32,
+                                        max_batch_chars=5000, concurrency=4, rate=None, max_retries=5,
+                                        base_delay=0.5, max_delay=30.0):
+    """Translates sentences with LibreTranslate by sending arrays of `q` in size-bounded batch requests.
+
+    If the server rejects a batch's content (400/413/422 or a malformed reply) it is split in half and
+    retried, so one bad sentence only turns itself into "[ERROR]". Connection failures and exhausted
+    retries mean the server itself is unavailable: the batch fails whole, and batches not yet sent are
+    failed without a request instead of each running the full backoff schedule.
+    """
+    results = ["" if not s.strip() else None for s in sentences]
+    pending = [i for i, s in enumerate(sentences) if s.strip()]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = TokenBucket(rate) if rate else None
+    outage = [] # Set to the first server-side failure; later batches fail fast
+
+    async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+        async def send_batch(indices):
+            payload = {"q": [sentences[i] for i in indices], "source": src_lang, "target": tgt_lang, "format": "text"}
+            if api_key:
+                payload["api_key"] = api_key
+            async with semaphore:
+                if outage:
+                    raise outage[0]
+                if bucket:
+                    await bucket.acquire()
+                with span("libretranslate.batch_request", sentences=len(indices),
+                          tokens_in=sum(len(sentences[i].split()) for i in indices)):
+                    response = await _with_retries(lambda: client.post(f"{base_url}/translate", json=payload),
+                                                   max_retries, base_delay, max_delay)
+            translated = response.json()["translatedText"]
+            if not isinstance(translated, list) or len(translated) != len(indices):
+                raise ValueError(f"expected {len(indices)} translations, got {translated!r:.80}")
+            return translated
+
+        async def translate_batch(indices):
+            try:
+                translated = await send_batch(indices)
+            except Exception as e:
+                if not _is_item_error(e):
+                    if not outage:
+                        outage.append(e)
+                        print(f"❌ LibreTranslate unavailable, failing the remaining batches: {e}")
+                    translated = ["[ERROR]"] * len(indices)
+                elif len(indices) > 1:
+                    middle = len(indices) // 2
+                    await asyncio.gather(translate_batch(indices[:middle]), translate_batch(indices[middle:]))
+                    return
+                else:
+                    print(f"❌ LibreTranslate error for '{sentences[indices[0]][:50]}...': {e}")
+                    translated = ["[ERROR]"]
+            for i, text in zip(indices, translated):
+                results[i] = text
+
+        batches = _make_batches(pending, sentences, max_batch_items, max_batch_chars)
+        await asyncio.gather(*(translate_batch(batch) for batch in batches))
+    return results
+
+
+@instrumented("google_translate.translate")
+def translate_google_concurrent(sentences, src_lang, tgt_lang, **kwargs):
+    """Blocking wrapper around translate_google_async for use from the benchmark scripts."""
+    return asyncio.run(translate_google_async(sentences, src_lang, tgt_lang, **kwargs))
+
+
+@instrumented("libretranslate.translate")
+def translate_libre_concurrent(sentences, src_lang, tgt_lang, base_url, **kwargs):
+    """Blocking wrapper around translate_libre_async for use from the benchmark scripts."""
+    return asyncio.run(translate_libre_async(sentences, src_lang, tgt_lang, base_url, **kwargs))
+
+
+@instrumented("libretranslate.translate_batched")
+def translate_libre_batched(sentences, src_lang, tgt_lang, base_url, **kwargs):
+    """Blocking wrapper around translate_libre_batched_async for use from the benchmark scripts."""
+    return asyncio.run(translate_libre_batched_async(sentences, src_lang, tgt_lang, base_url, **kwargs))
+
+
+if __name__ == "__main__":
+    from mock_translation_server import FAIL_MARKER, start_mock_server
+
+    server, mock_url = start_mock_server(latency=0.05, error_rate=0.2)
+    sentences = [f"Sentence number {i}." for i in range(200)]
+
+    start = time.perf_counter()
+    google = translate_google_concurrent(sentences, "en", "hi", base_url=mock_url, rate=None, base_delay=0.01)
+    print(f"Google (mock): {len(google)} sentences in {time.perf_counter() - start:.2f}s -> {google[0]}")
+
+    start = time.perf_counter()
+    libre = translate_libre_concurrent(sentences, "en", "hi", mock_url, base_delay=0.01)
+    print(f"LibreTranslate (mock): {len(libre)} sentences in {time.perf_counter() - start:.2f}s -> {libre[0]}")
+
+    assert google.count("[ERROR]") == 0 and libre.count("[ERROR]") == 0, "retries should absorb transient errors"
+
+    # Batched LibreTranslate: one poisoned sentence should map to [ERROR] without failing its neighbours
+    server.error_rate = 0.0
+    sentences[7] = f"{FAIL_MARKER} unsupported input"
+    requests_before = server.request_count
+    start = time.perf_counter()
+    batched = translate_libre_batched(sentences, "en", "hi", mock_url, base_delay=0.01)
+    print(f"LibreTranslate batched (mock): {len(batched)} sentences in {time.perf_counter() - start:.2f}s "
+          f"using {server.request_count - requests_before} requests")
+    assert batched[7] == "[ERROR]" and batched.count("[ERROR]") == 1
+    assert batched[:7] == libre[:7] and batched[8:] == libre[8:]
+    server.shutdown()
@@ -0,0 +1,129 @@
+# === Columnar Results Store ===
+# One row per (run, sentence, engine) with the source, reference, hypothesis, latency, token counts and
+# per-sentence scores, stored as uncompressed Arrow IPC part files in one directory. Each append writes a
+# new part file, so earlier results are never rewritten. Reads memory-map the parts and only touch the
+# requested columns, so rescoring or dashboards over millions of rows never load every translation.
+# export_parquet compacts everything into a single compressed Parquet file for sharing.
+#
+# Example:
+#   store = ResultsStore()
+#   table = store.read(columns=["engine", "bleu", "latency_ms"], engine="m2m418m")
+import glob
+import os
+import time
+import uuid
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+from scoring import CorpusScorer
+
+DEFAULT_STORE_DIR = os.path.join('..', '..', '06_Results', 'results_store')
+
+SCHEMA = pa.schema([
+    ("run_id", pa.string()),
+    ("sentence_id", pa.int64()),
+    ("engine", pa.dictionary(pa.int32(), pa.string())),
+    ("src_lang", pa.dictionary(pa.int32(), pa.string())),
+    ("tgt_lang", pa.dictionary(pa.int32(), pa.string())),
+    ("source", pa.string()),
+    ("reference", pa.string()),
+    ("hypothesis", pa.string()),
+    ("latency_ms", pa.float32()),
+    ("src_tokens", pa.int32()),
+    ("ref_tokens", pa.int32()),
+    ("hyp_tokens", pa.int32()),
+    ("bleu", pa.float32()),
+    ("chrf", pa.float32()),
+    ("ter", pa.float32()),
+])
+
+
+def new_run_id():
+    """Sortable identifier for one benchmark run."""
+    return time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8]
+
+
+def result_rows(run_id, engine, src_lang, tgt_lang, sources, references, hypotheses, latency_ms=None,
+                sentence_ids=None):
+    """Builds an Arrow table of one engine's results, scoring each sentence with BLEU, chrF and TER.
+
+    latency_ms is a per-sentence list or a single value (e.g. the engine's total time divided by the
+    number of sentences when only batch timings exist). Token counts use BLEU's 13a tokenization.
+    """
+    n = len(hypotheses)
+    hypotheses = [h if isinstance(h, str) else "" for h in hypotheses]
+    if latency_ms is None or isinstance(latency_ms, (int, float)):
+        latency_ms = [latency_ms] * n
+    scorers = {name: CorpusScorer(name).update(hypotheses, references) for name in ("bleu", "chrf", "ter")}
+    bleu_stats = scorers["bleu"].stats
+    tokenize = scorers["bleu"].metric.tokenizer
+    columns = {
+        "run_id": [run_id] * n,
+        "sentence_id": sentence_ids if sentence_ids is not None else list(range(n)),
+        "engine": [engine] * n,
+        "src_lang": [src_lang] * n,
+        "tgt_lang": [tgt_lang] * n,
+        "source": sources,
+        "reference": references,
+        "hypothesis": hypotheses,
+        "latency_ms": latency_ms,
+        "src_tokens": [len(tokenize(s).split()) for s in sources],
+        "ref_tokens": bleu_stats[:, 1],
+        "hyp_tokens": bleu_stats[:, 0],
+        "bleu": scorers["bleu"].sentence_scores(),
+        "chrf": scorers["chrf"].sentence_scores(),
+        "ter": scorers["ter"].sentence_scores(),
+    }
+    return pa.table({name: pa.array(values, type=SCHEMA.field(name).type) for name, values in columns.items()},
+                    schema=SCHEMA)
+
+
+class ResultsStore:
+    """Append-only directory of Arrow IPC part files sharing SCHEMA."""
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def parts(self):
+        return sorted(glob.glob(os.path.join(self.root, "part-*.arrow")))
+
+    def append(self, table):
+        """Writes table as a new part file; the rename makes it visible to readers only once complete."""
+        table = table.cast(SCHEMA)
+        name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.arrow"
+        tmp_path = os.path.join(self.root, "." + name + ".tmp")
+        with pa.OSFile(tmp_path, "wb") as sink, ipc.new_file(sink, SCHEMA) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, os.path.join(self.root, name))
+        return table.num_rows
+
+    def iter_batches(self, columns=None):
+        """Yields record batches part by part from memory-mapped files, restricted to columns."""
+        for path in self.parts():
+            with pa.memory_map(path, "r") as source:
+                reader = ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    batch = reader.get_batch(i)
+                    yield batch.select(columns) if columns else batch
+
+    def read(self, columns=None, engine=None, run_id=None):
+        """Returns a table of the requested columns, optionally filtered by engine and/or run."""
+        wanted = list(columns) if columns else SCHEMA.names
+        filters = {"engine": engine, "run_id": run_id}
+        needed = wanted + [name for name, value in filters.items() if value is not None and name not in wanted]
+        batches = list(self.iter_batches(needed))
+        table = pa.Table.from_batches(batches, schema=pa.schema([SCHEMA.field(name) for name in needed]))
+        for name, value in filters.items():
+            if value is not None:
+                table = table.filter(pc.equal(table[name].cast(pa.string()), value))
+        return table.select(wanted)
+
+    def export_parquet(self, path, compression="zstd"):
+        """Compacts all parts into one Parquet file, writing part by part to keep memory flat."""
+        import pyarrow.parquet as pq
+
+        with pq.ParquetWriter(path, SCHEMA, compression=compression) as writer:
+            for batch in self.iter_batches():
+                writer.write_batch(batch)
+        return path
@@ -0,0 +1,110 @@
+# === Significance Testing ===
+# Paired bootstrap resampling and approximate randomization over the per-sentence statistics kept by
+# scoring.CorpusScorer. Every resample is a row of a sentence-weight matrix, so thousands of corpus
+# scores come out of one matrix product and one vectorized scoring pass instead of re-running sacrebleu.
+import numpy as np
+from scoring import scores_from_totals
+
+# Resamples are scored in blocks so the weight matrix stays small for large corpora
+_BLOCK_SIZE = 1000
+
+
+def _resample_weights(rng, n_samples, n_sentences):
+    """(n_samples, n_sentences) matrix of how often each sentence is drawn in each bootstrap sample."""
+    draws = rng.integers(0, n_sentences, size=(n_samples, n_sentences))
+    weights = np.zeros((n_samples, n_sentences), dtype=np.int64)
+    np.add.at(weights, (np.arange(n_samples)[:, None], draws), 1)
+    return weights
+
+
+def _blocks(total):
+    for start in range(0, total, _BLOCK_SIZE):
+        yield min(_BLOCK_SIZE, total - start)
+
+
+def _check_paired(baseline, system):
+    if baseline.name != system.name or len(baseline) != len(system):
+        raise ValueError(f"Need the same metric over the same sentences, got {baseline.name} x {len(baseline)} "
+                         f"and {system.name} x {len(system)}")
+    if len(baseline) == 0:
+        raise ValueError("No sentences to resample")
+
+
+def bootstrap_ci(scorer, n_samples=1000, alpha=0.05, seed=0):
+    """Percentile bootstrap confidence interval for one system: returns (score, low, high)."""
+    if len(scorer) == 0:
+        raise ValueError("No sentences to resample")
+    rng = np.random.default_rng(seed)
+    stats = scorer.stats
+    samples = np.concatenate([scores_from_totals(scorer.metric, _resample_weights(rng, block, len(stats)) @ stats)
+                              for block in _blocks(n_samples)])
+    low, high = np.percentile(samples, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return scorer.score(), float(low), float(high)
+
+
+def paired_bootstrap(baseline, system, n_samples=1000, alpha=0.05, seed=0):
+    """Paired bootstrap test of system against baseline (Koehn, 2004).
+
+    Both systems are scored on the same resampled sentences. Returns a dict with the observed
+    score difference, its confidence interval and a two-sided p-value for "no difference"
+    (resampled differences are shifted to mean zero, as sacrebleu does).
+    """
+    _check_paired(baseline, system)
+    rng = np.random.default_rng(seed)
+    base_stats, sys_stats = baseline.stats, system.stats
+    deltas = []
+    for block in _blocks(n_samples):
+        weights = _resample_weights(rng, block, len(base_stats))
+        deltas.append(scores_from_totals(system.metric, weights @ sys_stats)
+                      - scores_from_totals(baseline.metric, weights @ base_stats))
+    deltas = np.concatenate(deltas)
+
+    observed = system.score() - baseline.score()
+    low, high = np.percentile(deltas, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    extreme = np.abs(deltas - deltas.mean()) >= abs(observed)
+    return {
+        "delta": observed,
+        "ci_low": float(low),
+        "ci_high": float(high),
+        "p_value": float((extreme.sum() + 1) / (n_samples + 1)),
+    }
+
+
+def approximate_randomization(baseline, system, n_trials=10000, seed=0):
+    """Approximate randomization test: randomly swaps the two systems' outputs per sentence.
+
+    Returns the two-sided p-value that the observed score difference arose by chance.
+    """
+    _check_paired(baseline, system)
+    rng = np.random.default_rng(seed)
+    base_stats, sys_stats = baseline.stats, system.stats
+    base_totals, sys_totals = baseline.totals, system.totals
+    swap_delta = base_stats - sys_stats
+    observed = abs(system.score() - baseline.score())
+    extreme = 0
+    for block in _blocks(n_trials):
+        swaps = rng.integers(0, 2, size=(block, len(base_stats)))
+        moved = swaps @ swap_delta # What the swapped sentences add to the system and take from the baseline
+        deltas = scores_from_totals(system.metric, sys_totals + moved) - scores_from_totals(baseline.metric, base_totals - moved)
+        extreme += int((np.abs(deltas) >= observed - 1e-9).sum())
+    return (extreme + 1) / (n_trials + 1)
+
+
+def significance_report(scorers, baseline=None, n_samples=1000, alpha=0.05, seed=0):
+    """Scores, bootstrap CIs and paired-bootstrap p-values against a baseline for several systems.
+
+    scorers maps system names to CorpusScorer objects over the same sentences; the baseline defaults
+    to the first system. Returns one dict per system in the same order.
+    """
+    if not scorers:
+        raise ValueError("significance_report needs at least one system to score")
+    baseline = baseline or next(iter(scorers))
+    if baseline not in scorers:
+        raise ValueError(f"Baseline '{baseline}' is not one of the scored systems: {', '.join(scorers)}")
+    rows = []
+    for name, scorer in scorers.items():
+        score, low, high = bootstrap_ci(scorer, n_samples, alpha, seed)
+        p_value = None if name == baseline else paired_bootstrap(scorers[baseline], scorer, n_samples, alpha, seed)["p_value"]
+        rows.append({"system": name, "score": score, "ci_low": low, "ci_high": high,
+                     "baseline": baseline, "p_value": p_value})
+    return rows
@@ -0,0 +1,134 @@
+# === Translation Cache ===
+# On-disk SQLite cache so re-runs only send sentences that have never been translated to an engine.
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join('..', '..', '06_Results', 'translation_cache.sqlite3')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_SQLITE_BATCH = 500 # Stay well under SQLite's bound-parameter limit
+
+
+def cache_key(engine, model_name, src_lang, tgt_lang, sentence):
+    """Builds the cache key from the engine settings and a SHA-256 content hash of the sentence."""
+    sentence_hash = hashlib.sha256(sentence.encode('utf-8')).hexdigest()
+    return f"{engine}|{model_name}|{src_lang}|{tgt_lang}|{sentence_hash}"
+
+
+class TranslationCache:
+    """SQLite-backed translation store with least-recently-used eviction once max_bytes is exceeded."""
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        # Engines run on separate threads (see engine_scheduler), so share one connection behind a lock
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, translation TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON translations(last_used)")
+        # Running total of the stored size, so a put doesn't have to SUM the whole table
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self.conn.execute(
+            "INSERT OR IGNORE INTO meta SELECT 'total_size', COALESCE(SUM(size), 0) FROM translations"
+        )
+        self.conn.commit()
+
+    def get_many(self, keys):
+        """Returns a {key: translation} dict for the keys that are cached, refreshing their LRU time."""
+        with self.lock:
+            return self._get_many(keys)
+
+    def _get_many(self, keys):
+        found = {}
+        keys = list(keys)
+        for i in range(0, len(keys), _SQLITE_BATCH):
+            chunk = keys[i:i+_SQLITE_BATCH]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, translation FROM translations WHERE key IN ({placeholders})", chunk
+            )
+            found.update(rows)
+        if found:
+            now = time.time()
+            self.conn.executemany("UPDATE translations SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+            self.conn.commit()
+        return found
+
+    def put_many(self, items):
+        """Stores (key, translation) pairs and evicts old entries if the cache grew past max_bytes."""
+        with self.lock:
+            self._put_many(items)
+
+    def _put_many(self, items):
+        now = time.time()
+        rows = [(key, text, len(key) + len(text.encode('utf-8')), now) for key, text in items]
+        if not rows:
+            return
+        # Replaced keys give back their old size
+        replaced = 0
+        for i in range(0, len(rows), _SQLITE_BATCH):
+            chunk = [row[0] for row in rows[i:i+_SQLITE_BATCH]]
+            placeholders = ",".join("?" * len(chunk))
+            replaced += self.conn.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM translations WHERE key IN ({placeholders})", chunk
+            ).fetchone()[0]
+        self.conn.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)", rows)
+        added = sum(row[2] for row in {row[0]: row for row in rows}.values()) - replaced
+        self.conn.execute("UPDATE meta SET value = value + ? WHERE name = 'total_size'", (added,))
+        self.conn.commit()
+        self._evict()
+
+    def _evict(self):
+        """Deletes least-recently-used entries until the stored size is back under max_bytes."""
+        if self.max_bytes is None:
+            return
+        total = self.conn.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        stale = []
+        freed = 0
+        for key, size in self.conn.execute("SELECT key, size FROM translations ORDER BY last_used"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self.conn.executemany("DELETE FROM translations WHERE key = ?", stale)
+        self.conn.execute("UPDATE meta SET value = value - ? WHERE name = 'total_size'", (freed,))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def cached_translate(cache, engine, model_name, src_lang, tgt_lang, sentences, translate_fn):
+    """Translates sentences through the cache, calling translate_fn only on unique cache misses.
+
+    Failed translations ("[ERROR]") are returned but never stored, so they are retried next run.
+    """
+    keys = [cache_key(engine, model_name, src_lang, tgt_lang, s) for s in sentences]
+    found = cache.get_many(keys)
+    hits = sum(key in found for key in keys)
+
+    missing = {}
+    for key, sentence in zip(keys, sentences):
+        if key not in found and key not in missing:
+            missing[key] = sentence
+    if missing:
+        print(f"{engine} ({model_name}): {hits} cached, {len(missing)} unique to translate.")
+        translated = translate_fn(list(missing.values()))
+        new_items = dict(zip(missing.keys(), translated))
+        cache.put_many((k, v) for k, v in new_items.items() if v != "[ERROR]")
+        found.update(new_items)
+    else:
+        print(f"{engine} ({model_name}): all {len(sentences)} sentences cached.")
+    return [found[key] for key in keys]
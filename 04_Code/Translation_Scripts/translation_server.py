@@ -0,0 +1,290 @@
+# === Translation Server ===
+# Long-running local HTTP service around the benchmark engines. Models stay warm in the model registry,
+# and concurrent single-sentence requests are coalesced into micro-batches (per engine and language pair)
+# that are flushed when full or when the oldest request has waited max_wait_ms.
+#
+# POST /translate  {"q": "text" | ["text", ...], "source": "en", "target": "hi", "engine": "m2m418m"}
+#                  -> {"translatedText": "..." | [...]}   (LibreTranslate-compatible shape)
+# GET  /metrics    -> per-engine request and failure counts, p50/p99 latency and mean batch size
+# GET  /health     -> {"status": "ok"}
+#
+# Example (from 04_Code/Translation_Scripts/):
+#   python translation_server.py --port 5050 --preload m2m418m:en:hi
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+from argos_parallel import ensure_argos_package, load_argos_translator
+from m2m_translation import M2M_ENGINES, translate_with_model, model_registry
+
+ENGINES = tuple(M2M_ENGINES) + ("argos",)
+
+
+class LatencyStats:
+    """Rolling window of request latencies and batch sizes for one engine."""
+
+    def __init__(self, window=10000):
+        self.latencies_ms = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def record_batch(self, latencies_ms):
+        with self.lock:
+            self.latencies_ms.extend(latencies_ms)
+            self.batch_sizes.append(len(latencies_ms))
+            self.requests += len(latencies_ms)
+
+    def record_failures(self, count):
+        # Failed requests are counted but kept out of the latency window, so errors don't look like fast responses
+        with self.lock:
+            self.failures += count
+
+    def snapshot(self):
+        with self.lock:
+            latencies = sorted(self.latencies_ms)
+            batch_sizes = list(self.batch_sizes)
+            requests = self.requests
+            failures = self.failures
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))], 2)
+
+        return {
+            "requests": requests,
+            "failures": failures,
+            "p50_ms": percentile(50),
+            "p99_ms": percentile(99),
+            "mean_batch_size": round(sum(batch_sizes) / len(batch_sizes), 2) if batch_sizes else None,
+        }
+
+
+class MicroBatcher:
+    """Queues single sentences and runs them through batch_fn in micro-batches on a background thread."""
+
+    def __init__(self, batch_fn, stats, max_batch_size=32, max_wait_ms=10.0):
+        self.batch_fn = batch_fn
+        self.stats = stats
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = deque()
+        self.condition = threading.Condition()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, text):
+        future = Future()
+        with self.condition:
+            self.queue.append((text, future, time.perf_counter()))
+            self.condition.notify()
+        return future
+
+    def _next_batch(self):
+        with self.condition:
+            self.condition.wait_for(lambda: self.queue)
+            # The oldest request sets the deadline; fill the batch until it is full or the deadline passes
+            deadline = self.queue[0][2] + self.max_wait
+            while len(self.queue) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            return [self.queue.popleft() for _ in range(min(self.max_batch_size, len(self.queue)))]
+
+    def _call(self, texts):
+        results = self.batch_fn(texts)
+        if len(results) != len(texts):
+            raise RuntimeError(f"batch_fn returned {len(results)} results for {len(texts)} inputs")
+        return results
+
+    def _run_each(self, texts):
+        """Runs texts one at a time, returning (result, error) per text."""
+        outcomes = []
+        for text in texts:
+            try:
+                outcomes.append((self._call([text])[0], None))
+            except Exception as e:
+                print(f"❌ Translation failed for '{text[:50]}...': {e}")
+                outcomes.append((None, RuntimeError(f"Translation failed: {e}")))
+        return outcomes
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            texts = [text for text, _, _ in batch]
+            try:
+                outcomes = [(result, None) for result in self._call(texts)]
+            except Exception as e:
+                # Retry one by one, so a single bad input only fails its own request
+                print(f"❌ Batch of {len(batch)} failed: {e}")
+                outcomes = self._run_each(texts) if len(batch) > 1 else [(None, RuntimeError(f"Translation failed: {e}"))]
+            done = time.perf_counter()
+            latencies_ms = []
+            for (_, future, submitted), (result, error) in zip(batch, outcomes):
+                if error is None:
+                    future.set_result(result)
+                    latencies_ms.append(1000 * (done - submitted))
+                else:
+                    future.set_exception(error)
+            if latencies_ms:
+                self.stats.record_batch(latencies_ms)
+            if len(latencies_ms) < len(batch):
+                self.stats.record_failures(len(batch) - len(latencies_ms))
+
+
+class TranslationService:
+    """Owns one MicroBatcher per (engine, source, target) and the latency stats per engine."""
+
+    def __init__(self, max_batch_size=32, max_wait_ms=10.0, precision="fp32", runtime="pytorch", decoding="default"):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.precision = precision
+        self.runtime = runtime
+        self.decoding = decoding
+        self.batchers = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def _batch_fn(self, engine, src_lang, tgt_lang):
+        if engine in M2M_ENGINES:
+            return lambda batch: translate_with_model(M2M_ENGINES[engine], batch, src_lang, tgt_lang,
+                                                      precision=self.precision, decoding=self.decoding,
+                                                      runtime=self.runtime)
+        # Install the package now (at preload or the pair's first request) rather than failing in the loader
+        if not ensure_argos_package(src_lang, tgt_lang):
+            raise ValueError(f"Argos Translate {src_lang}-{tgt_lang} package is not available")
+        key = f"argos:{src_lang}-{tgt_lang}"
+        with model_registry.lock:
+            if key not in model_registry.loaders:
+                model_registry.register(key, lambda: load_argos_translator(src_lang, tgt_lang), 0.5)
+        return lambda batch: [model_registry.get(key).translate(s) for s in batch]
+
+    def batcher(self, engine, src_lang, tgt_lang):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Available: {', '.join(ENGINES)}")
+        key = (engine, src_lang, tgt_lang)
+        with self.lock:
+            if key in self.batchers:
+                return self.batchers[key]
+        # Built outside the lock: installing an Argos package can take minutes, and requests for
+        # pairs that are already being served must not wait on it
+        batch_fn = self._batch_fn(engine, src_lang, tgt_lang)
+        with self.lock:
+            if key not in self.batchers:
+                stats = self.stats.setdefault(engine, LatencyStats())
+                self.batchers[key] = MicroBatcher(batch_fn, stats, self.max_batch_size, self.max_wait_ms)
+            return self.batchers[key]
+
+    def translate(self, texts, src_lang, tgt_lang, engine):
+        batcher = self.batcher(engine, src_lang, tgt_lang)
+        futures = [batcher.submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    def warm_up(self, engine, src_lang, tgt_lang):
+        print(f"Warming up {engine} ({src_lang} → {tgt_lang})...")
+        self.translate(["Warm-up."], src_lang, tgt_lang, engine)
+
+    def metrics(self):
+        return {engine: stats.snapshot() for engine, stats in self.stats.items()}
+
+
+def parse_translate_request(payload):
+    """Validates a /translate body; returns (q, texts, source, target, engine) or raises KeyError/ValueError."""
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    q = payload["q"]
+    texts = q if isinstance(q, list) else [q]
+    if not all(isinstance(text, str) for text in texts):
+        raise ValueError("'q' must be a string or a list of strings")
+    fields = [payload["source"], payload["target"], payload.get("engine", "m2m418m")]
+    if not all(isinstance(field, str) for field in fields):
+        raise ValueError("'source', 'target' and 'engine' must be strings")
+    return (q, texts, *fields)
+
+
+class TranslationRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            self._send_json(200, self.server.service.metrics())
+        elif path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/translate":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            q, texts, src_lang, tgt_lang, engine = parse_translate_request(payload)
+            translated = self.server.service.translate(texts, src_lang, tgt_lang, engine)
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except RuntimeError as e:
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, {"translatedText": translated if isinstance(q, list) else translated[0]})
+
+    def log_message(self, format, *args):
+        pass # Latency is reported through /metrics instead
+
+
+class TranslationHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128 # Bursts of concurrent clients are the point; the default backlog of 5 resets them
+
+
+def start_translation_server(service, host="127.0.0.1", port=5050):
+    """Starts the HTTP server on a background thread and returns (server, base_url)."""
+    server = TranslationHTTPServer((host, port), TranslationRequestHandler)
+    server.service = service
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the benchmark engines over HTTP with micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5050)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--precision", default="fp32")
+    parser.add_argument("--runtime", default="pytorch")
+    parser.add_argument("--decoding", default="default")
+    parser.add_argument("--preload", nargs="*", default=[], metavar="ENGINE:SRC:TGT",
+                        help="Engines to load before accepting requests, e.g. m2m418m:en:hi argos:en:zh")
+    args = parser.parse_args()
+
+    service = TranslationService(args.max_batch_size, args.max_wait_ms, args.precision, args.runtime, args.decoding)
+    for spec in args.preload:
+        engine, src_lang, tgt_lang = spec.split(":")
+        service.warm_up(engine, src_lang, tgt_lang)
+    server, base_url = start_translation_server(service, args.host, args.port)
+    print(f"✅ Translation server listening on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()